@@ -0,0 +1,394 @@
+"""The required libraries."""
+import asyncio
+import math
+import random
+import time
+import numpy as np
+import Ingestion
+
+
+# The command asking an instrument for a reading. The instrument answers
+# with a line "reading,range,frequency", where the range and the frequency
+# can be empty or missing.
+READ = b"READ?\n"
+
+
+def _parse(line):
+    """
+    Convert the answer of an instrument to (reading, range, frequency).
+
+    The fields which are not numbers are NaN, e.g. the "OL" of an
+    overloaded meter or an "ERR", so a bad answer is flagged as over range
+    by the conversion instead of stopping the acquisition.
+    """
+    fields = line.decode("ascii", "replace").strip().split(",")
+    fields += [""] * (3 - len(fields))
+    result = []
+    for field in fields[:3]:
+        try:
+            result.append(float(field))
+        except ValueError:
+            result.append(math.nan)
+    return tuple(result)
+
+
+class SimulatedInstrument:
+    """
+    A simulated instrument, serving readings over a local socket.
+
+    It answers every READ? command with a reading drawn from a normal
+    distribution, after a delay which simulates the time of a measurement,
+    so an acquisition can be tested without any hardware. Subclasses can
+    override reading to serve other signals.
+
+    It can be used as an asynchronous context manager:
+
+        async with SimulatedInstrument(1.5, 0.01) as instrument:
+            channel = Channel("V", "amprobe37XRA_DCvoltage",
+                              *instrument.address)
+    """
+
+    def __init__(self, value=1., noise=0.01, selected_range=None, freq=None,
+                 delay=0., seed=None):
+        """
+        Initialize the class.
+
+        Parameters:
+            value (float, default=1.): the mean of the readings.
+            noise (float, default=0.01): the standard deviation of the
+                readings.
+            selected_range (float, default=None): the full scale sent with
+                every reading, if any.
+            freq (float, default=None): the frequency sent with every
+                reading, if any.
+            delay (float, default=0.): the time of a measurement, in seconds.
+            seed (int, default=None): the seed of the random readings.
+        """
+        self.value = value
+        self.noise = noise
+        self.selected_range = selected_range
+        self.freq = freq
+        self.delay = delay
+        self.random = random.Random(seed)
+        self.address = None
+        self._server = None
+        self._clients = {}
+
+    def reading(self):
+        """
+        Return the next reading.
+
+        Returns:
+            reading (float, str, tuple): the reading, or the tuple (reading,
+                range, frequency). Strings are sent as they are, e.g. "OL"
+                for an overload.
+        """
+        return self.random.gauss(self.value, self.noise)
+
+    def _answer(self):
+        """Format the next reading as a line."""
+        reading = self.reading()
+        if not isinstance(reading, tuple):
+            reading = (reading, self.selected_range, self.freq)
+        return (",".join("" if field is None else field
+                         if isinstance(field, str) else repr(float(field))
+                         for field in reading) + "\n").encode("ascii")
+
+    async def _serve(self, reader, writer):
+        """Answer the commands of a client until it disconnects."""
+        self._clients[asyncio.current_task()] = writer
+        try:
+            while command := await reader.readline():
+                command = command.strip().upper()
+                if command == READ.strip():
+                    if self.delay:
+                        await asyncio.sleep(self.delay)
+                    writer.write(self._answer())
+                elif command == b"*IDN?":
+                    writer.write(b"SimulatedInstrument\n")
+                else:
+                    writer.write(b"ERR\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            del self._clients[asyncio.current_task()]
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=0):
+        """
+        Start serving the readings.
+
+        Parameters:
+            host (str, default="127.0.0.1"): the address of the server.
+            port (int, default=0): the port of the server, 0 for any free
+                port.
+
+        Returns:
+            address (tuple): the host and the port of the server.
+        """
+        self._server = await asyncio.start_server(self._serve, host, port)
+        self.address = self._server.sockets[0].getsockname()[:2]
+        return self.address
+
+    async def stop(self):
+        """Stop serving the readings."""
+        if self._server is not None:
+            self._server.close()
+            for writer in self._clients.values():
+                writer.close()
+            await asyncio.gather(*self._clients, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exception):
+        await self.stop()
+
+
+class Channel:
+    """
+    A source of readings of an instrument.
+
+    The readings are polled over a socket and converted in batches with the
+    masked array path of Instruments, as by Ingestion.measure. The batches
+    are produced by an asynchronous iterator, so an instrument is polled only
+    while its batches are consumed.
+    """
+
+    def __init__(self, name, instrument, host, port, freq=None, count=None,
+                 batch_size=256, timeout=0.5, interval=0., **options):
+        """
+        Initialize the class.
+
+        Parameters:
+            name (str): the name of the channel.
+            instrument (str, InstrumentSpec): the instrument, or the name of a
+                registered instrument, see Ingestion.measure.
+            host (str): the address of the instrument.
+            port (int): the port of the instrument.
+            freq (float, default=None): the frequency of the readings sent
+                without one.
+            count (int, default=None): the number of readings to acquire,
+                None to acquire until the acquisition is stopped.
+            batch_size (int, default=256): the maximum number of readings of
+                a batch.
+            timeout (float, default=0.5): the time in seconds after which a
+                batch is sent even if it is not full, so a slow instrument
+                still delivers its readings.
+            interval (float, default=0.): the time in seconds between two
+                readings.
+            options: the sensitivity options, e.g. x2sens=True.
+        """
+        self.name = name
+        self.instrument = instrument
+        self.host = host
+        self.port = port
+        self.freq = freq
+        self.count = count
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.interval = interval
+        self.options = options
+        self._reader = None
+        self._writer = None
+
+    async def connect(self):
+        """Connect to the instrument."""
+        self._reader, self._writer = await asyncio.open_connection(
+            self.host, self.port)
+
+    async def close(self):
+        """Disconnect from the instrument."""
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+            self._reader = self._writer = None
+
+    async def read(self):
+        """
+        Poll the instrument for a reading.
+
+        Returns:
+            reading (tuple): the reading, the full scale of the range and the
+                frequency, NaN when not sent by the instrument.
+        """
+        if self._writer is None:
+            await self.connect()
+        self._writer.write(READ)
+        await self._writer.drain()
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("The instrument " + repr(self.name)
+                                  + " closed the connection.")
+        return _parse(line)
+
+    def _batch(self, timestamps, readings):
+        """Convert some readings to a batch."""
+        reading, selected_range, frequency = np.array(
+            readings, dtype=np.float64).reshape(-1, 3).T
+        chunk = {"timestamp": np.array(timestamps), "reading": reading,
+                 "range": selected_range, "frequency": frequency}
+        return next(Ingestion.measure([chunk], self.instrument, self.freq,
+                                      **self.options))
+
+    async def batches(self):
+        """
+        Poll the instrument and yield the converted readings.
+
+        The connection is closed when the readings are over or the iteration
+        is stopped. The answers which are not numbers are flagged, only a
+        lost connection stops the iteration, after the readings already
+        received.
+
+        Yields:
+            batch (dict): the arrays "timestamp", "reading", "range",
+                "frequency", "data", "valid" and "reasons" of the readings,
+                as the chunks of Ingestion.measure.
+        """
+        loop = asyncio.get_running_loop()
+        remaining = math.inf if self.count is None else self.count
+        timestamps, readings = [], []
+        deadline = loop.time() + self.timeout
+        try:
+            while remaining:
+                try:
+                    readings.append(await self.read())
+                except ConnectionError:
+                    if readings:
+                        yield self._batch(timestamps, readings)
+                    raise
+                timestamps.append(time.time())
+                remaining -= 1
+                if len(readings) >= self.batch_size\
+                        or loop.time() >= deadline or not remaining:
+                    yield self._batch(timestamps, readings)
+                    timestamps, readings = [], []
+                    deadline = loop.time() + self.timeout
+                if self.interval and remaining:
+                    await asyncio.sleep(self.interval)
+        finally:
+            await self.close()
+
+    def __aiter__(self):
+        return self.batches()
+
+
+class Acquisition:
+    """
+    A concurrent acquisition from several channels.
+
+    Every channel is polled by its own task, so a slow instrument does not
+    stall the others. The batches of all the channels go through a bounded
+    queue: when the consumer falls behind, the queue fills up and the
+    channels stop polling their instruments until there is room again.
+
+    It can be used as an asynchronous context manager and iterator:
+
+        async with Acquisition(channels) as acquisition:
+            async for name, batch in acquisition:
+                mean.add_arrays(batch["data"].value[batch["valid"]],
+                                batch["data"].uncertainty[batch["valid"]])
+    """
+
+    def __init__(self, channels, maxsize=16):
+        """
+        Initialize the class.
+
+        Parameters:
+            channels (iterable): the channels to be acquired.
+            maxsize (int, default=16): the maximum number of batches waiting
+                for the consumer.
+        """
+        self.channels = list(channels)
+        self.maxsize = maxsize
+        self._queue = None
+        self._tasks = []
+        self._running = 0
+
+    async def _run(self, channel):
+        """Put the batches of a channel in the queue."""
+        try:
+            async for batch in channel:
+                await self._queue.put((channel.name, batch))
+        except Exception as error:
+            await self._queue.put((channel.name, error))
+        else:
+            await self._queue.put((channel.name, None))
+
+    async def start(self):
+        """
+        Connect to the instruments and start polling them.
+
+        If any instrument cannot be reached, the channels already connected
+        are closed before the error is raised.
+        """
+        if self._tasks:
+            raise RuntimeError("The acquisition is already running.")
+
+        self._queue = asyncio.Queue(self.maxsize)
+        results = await asyncio.gather(*(channel.connect()
+                                         for channel in self.channels),
+                                       return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                await asyncio.gather(*(channel.close()
+                                       for channel in self.channels))
+                raise result
+        self._running = len(self.channels)
+        self._tasks = [asyncio.create_task(self._run(channel))
+                       for channel in self.channels]
+
+    async def stop(self):
+        """Stop polling and disconnect from the instruments."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._running = 0
+        await asyncio.gather(*(channel.close() for channel in self.channels))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        """
+        Wait for the next batch of any channel.
+
+        Returns:
+            name (str): the name of the channel.
+            batch (dict): the batch, see Channel.batches.
+
+        Raises:
+            ConnectionError: if the connection to an instrument is lost,
+                after the batches received from it.
+        """
+        while self._running:
+            name, batch = await self._queue.get()
+            if batch is None:
+                self._running -= 1
+            elif isinstance(batch, Exception):
+                self._running -= 1
+                raise batch
+            else:
+                return name, batch
+        raise StopAsyncIteration
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exception):
+        await self.stop()
+
+
+if __name__ == "__main__":
+    print("Hi, this is the Acquisition library.\n\
+           It polls several instruments at once and converts their readings\
+           in batches.")
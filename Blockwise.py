@@ -0,0 +1,187 @@
+"""The required libraries."""
+import numbers
+import numpy as np
+from Datum import Datum
+from DatumArray import DatumArray
+from WeightedMean import WeightedMean
+from DataFile import create_data
+
+
+def _sized(column):
+    """Check whether a column is an array, sliced along its first axis."""
+    return isinstance(column, (DatumArray, np.ndarray))\
+        and np.ndim(column.value if isinstance(column, DatumArray)
+                    else column) > 0
+
+
+def blocks(columns, block_size=65536):
+    """
+    Iterate over some columns of data, one block at a time.
+
+    The columns can be arrays, e.g. the memory-mapped DatumArray returned by
+    DataFile.read_data, which are sliced without copies, or streams of
+    chunks, e.g. generators of DatumArray, which set the size of the blocks.
+    Datum and numbers are passed unchanged to every block.
+
+    Parameters:
+        columns (list): the columns.
+        block_size (int, default=65536): the number of rows of a block of
+            arrays, when no column is a stream.
+
+    Yields:
+        block (list): the blocks of the columns.
+    """
+    columns = list(columns)
+    sized = [_sized(column) for column in columns]
+    constant = [isinstance(column, (Datum, numbers.Number))
+                for column in columns]
+    streams = {index: iter(column) for index, column in enumerate(columns)
+               if not (sized[index] or constant[index])}
+    lengths = {len(column) for column, is_sized in zip(columns, sized)
+               if is_sized}
+    if len(lengths) > 1:
+        raise ValueError("The columns have different lengths.")
+    if not lengths and not streams:
+        raise ValueError("At least one column must be an array or a stream.")
+
+    total = lengths.pop() if lengths else None
+    position = 0
+    while True:
+        chunks = {}
+        try:
+            for index, stream in streams.items():
+                chunks[index] = next(stream)
+        except StopIteration:
+            return
+        if chunks:
+            length = len(next(iter(chunks.values())))
+        else:
+            length = min(block_size, total - position)
+            if length <= 0:
+                return
+
+        block = []
+        for index, column in enumerate(columns):
+            if index in chunks:
+                block.append(chunks[index])
+            elif sized[index]:
+                block.append(column[position:position + length])
+            else:
+                block.append(column)
+        position += length
+        yield block
+
+
+def _propagate(function, columns, block_size):
+    """Yield the results of function on every block of the columns."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for block in blocks(columns, block_size):
+            yield function(*block)
+
+
+def propagate(function, columns, file=None, name="result",
+              block_size=65536, metadata=None):
+    """
+    Apply a function to some columns of data, one block at a time.
+
+    The function receives one block per column and it is applied with the
+    operators, the NumPy ufuncs or the static functions of Datum, so peak
+    memory is one block per operand whatever the size of the columns.
+
+    Parameters:
+        function (callable): the function. It returns a DatumArray or an
+            array of exact values for every block.
+        columns (list): the columns, see blocks.
+        file (str, os.PathLike, default=None): if given, the results are
+            written block by block to a data file, in the column called
+            name. The length of the columns must be known, so at least one
+            of them must be an array.
+        name (str, default="result"): the name of the column of results.
+        block_size (int, default=65536): the number of rows of a block.
+        metadata (dict, default=None): the metadata of the data file.
+
+    Returns:
+        results (generator, DatumArray): the results of every block or, if
+            file is given, the memory-mapped column of the data file.
+    """
+    if file is None:
+        return _propagate(function, columns, block_size)
+
+    columns = list(columns)
+    lengths = [len(column) for column in columns if _sized(column)]
+    if not lengths:
+        raise ValueError("At least one column must be an array to write a "
+                         "data file.")
+
+    output = None
+    position = 0
+    for result in _propagate(function, columns, block_size):
+        if isinstance(result, (Datum, DatumArray)):
+            value, uncertainty = result.value, result.uncertainty
+        else:
+            value, uncertainty = np.asarray(result, dtype=np.float64), 0.
+        if output is None:
+            output = create_data(file, {name: (lengths[0],)
+                                        + np.shape(value)[1:]},
+                                 metadata)[name]
+        output.value[position:position + len(value)] = value
+        output.uncertainty[position:position + len(value)] = uncertainty
+        position += len(value)
+
+    if output is None:
+        output = create_data(file, {name: (0,)}, metadata)[name]
+    output.value.flush()
+    output.uncertainty.flush()
+    return output
+
+
+def weighted_mean(column, block_size=65536):
+    """
+    Return the weighted mean of a column of data, one block at a time.
+
+    Parameters:
+        column (DatumArray, iterable): the column, see blocks.
+        block_size (int, default=65536): the number of rows of a block.
+
+    Returns:
+        mean (Datum): the weighted mean.
+    """
+    return WeightedMean(block for block, in blocks([column],
+                                                   block_size)).result()
+
+
+def compatibility(column1, column2, dof=None, file=None, name="pVal",
+                  block_size=65536):
+    """
+    Check the compatibility of two columns of data, row by row.
+
+    This function performs the normal test (or the student test, if the
+    degrees of freedom are given) of Datum one block at a time.
+
+    Parameters:
+        column1, column2: the columns, see blocks.
+        dof (float, default=None): if given, the degrees of freedom of the
+            student test.
+        file (str, os.PathLike, default=None): if given, the p-values are
+            written to a data file, see propagate.
+        name (str, default="pVal"): the name of the column of p-values.
+        block_size (int, default=65536): the number of rows of a block.
+
+    Returns:
+        pVal (generator, DatumArray): the p-values of every block or, if
+            file is given, the memory-mapped column of the data file.
+    """
+    if dof is None:
+        def test(datum1, datum2):
+            return Datum.normal_compatible(datum1, datum2)
+    else:
+        def test(datum1, datum2):
+            return Datum.student_compatible(datum1, datum2, dof)
+
+    return propagate(test, [column1, column2], file, name, block_size)
+
+
+if __name__ == "__main__":
+    print("Hi, this is the Blockwise library.\n\
+           It propagates the uncertainty through columns of data larger\
+           than the memory, one block at a time.")
@@ -0,0 +1,215 @@
+"""The required libraries."""
+import json
+import struct
+import numpy as np
+from DatumArray import DatumArray
+
+
+# The layout of a data file:
+#   - 8 bytes: the magic string MAGIC, whose last byte is the version;
+#   - 8 bytes: the length of the header, as a little endian unsigned integer;
+#   - the header: a UTF-8 JSON object with the keys "columns" and "metadata";
+#   - the data section, starting at the first multiple of ALIGNMENT bytes
+#     after the header: the arrays, as little endian float64 in C order, each
+#     one starting at a multiple of ALIGNMENT bytes.
+# Every entry of "columns" has the keys "name", "shape", "value",
+# "uncertainty" and "covariance": the last three are the offsets of the
+# arrays from the beginning of the data section, "covariance" being null if
+# the column has none. A covariance has its own "covariance_shape": it can be
+# the full matrix or the bands accepted by DatumArray.sum.
+MAGIC = b"\x93DATUMS\x01"
+ALIGNMENT = 64
+_DTYPE = np.dtype("<f8")
+
+
+def _aligned(offset):
+    """Return the first multiple of ALIGNMENT not smaller than offset."""
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _write_array(stream, start, offset, array, chunk_size=1 << 20):
+    """Write an array at its offset, a chunk at a time."""
+    stream.write(b"\x00" * (start + offset - stream.tell()))
+    flat = np.ravel(array)
+    for begin in range(0, flat.size, chunk_size):
+        stream.write(np.ascontiguousarray(flat[begin:begin + chunk_size],
+                                          dtype=_DTYPE).tobytes())
+
+
+def _header(specifications, metadata):
+    """
+    Build the header of a data file.
+
+    Parameters:
+        specifications ([(str, tuple, tuple)]): the name, the shape and the
+            shape of the covariance (None if absent) of every column.
+        metadata (dict): the metadata.
+
+    Returns:
+        header (bytes): the header, with the magic string and its length.
+        start (int): the position of the data section in the file.
+        offsets ([int]): the offsets of the arrays in the data section, in
+            the order in which they are written.
+        size (int): the size of the data section.
+    """
+    entries = []
+    offsets = []
+    offset = 0
+    for name, shape, covariance_shape in specifications:
+        entry = {"name": str(name), "shape": list(shape)}
+        for key, array_shape in (("value", shape), ("uncertainty", shape),
+                                 ("covariance", covariance_shape)):
+            if array_shape is None:
+                entry[key] = None
+                continue
+            entry[key] = offset
+            offsets.append(offset)
+            offset += int(np.prod(array_shape))*_DTYPE.itemsize
+            size = offset
+            offset = _aligned(offset)
+        if covariance_shape is not None:
+            entry["covariance_shape"] = list(covariance_shape)
+        entries.append(entry)
+
+    header = json.dumps({"columns": entries, "metadata": metadata or {}},
+                        ensure_ascii=False).encode("utf-8")
+    header = MAGIC + struct.pack("<Q", len(header)) + header
+    return header, _aligned(len(header)), offsets, size if offsets else 0
+
+
+def write_data(file, columns, covariance=None, metadata=None):
+    """
+    Write some columns of data to a binary data file.
+
+    The file stores the values and the uncertainties of every column as raw
+    float64 arrays, so it is much smaller and faster than a pickled list of
+    Datum or a CSV file, and it can be read back without copies by
+    read_data.
+
+    Parameters:
+        file (str, os.PathLike): the name of the file.
+        columns (dict): the columns, by name. Every column can be a
+            DatumArray or an array of exact values.
+        covariance (dict, default=None): the covariances of some columns,
+            by name, as the full matrix or as bands (see DatumArray.sum).
+        metadata (dict, default=None): any information to be stored with
+            the data. It must be serializable as JSON.
+    """
+    covariance = {} if covariance is None else covariance
+    specifications = []
+    arrays = []
+    for name, column in columns.items():
+        if isinstance(column, DatumArray):
+            value, uncertainty = column.value, column.uncertainty
+        else:
+            value = np.asarray(column, dtype=np.float64)
+            uncertainty = np.zeros_like(value)
+        matrix = covariance.get(name)
+        arrays.extend((value, uncertainty))
+        if matrix is not None:
+            matrix = np.asarray(matrix, dtype=np.float64)
+            arrays.append(matrix)
+        specifications.append((name, value.shape,
+                               None if matrix is None else matrix.shape))
+
+    header, start, offsets, _ = _header(specifications, metadata)
+    with open(file, "wb") as stream:
+        stream.write(header)
+        for offset, array in zip(offsets, arrays):
+            _write_array(stream, start, offset, array)
+
+
+def create_data(file, shapes, metadata=None):
+    """
+    Create a data file to be filled incrementally.
+
+    The file is created with its final size, filled with zeros, and its
+    columns are returned memory-mapped for writing, so that the results of
+    a long computation can be stored block by block.
+
+    Parameters:
+        file (str, os.PathLike): the name of the file.
+        shapes (dict): the shapes of the columns, by name.
+        metadata (dict, default=None): any information to be stored with
+            the data. It must be serializable as JSON.
+
+    Returns:
+        columns (dict): the columns, by name, as DatumArray.
+    """
+    header, start, _, size = _header([(name, tuple(shape), None) for
+                                      name, shape in shapes.items()],
+                                     metadata)
+    with open(file, "wb") as stream:
+        stream.write(header)
+        stream.truncate(start + size)
+    return read_data(file, mmap_mode="r+")[0]
+
+
+def read_header(file):
+    """
+    Read the header of a data file.
+
+    Parameters:
+        file (str, os.PathLike): the name of the file.
+
+    Returns:
+        header (dict): the header, with the columns and the metadata.
+        start (int): the position of the data section in the file.
+    """
+    with open(file, "rb") as stream:
+        if stream.read(len(MAGIC)) != MAGIC:
+            raise ValueError("The file is not a data file of this version.")
+        length, = struct.unpack("<Q", stream.read(8))
+        header = json.loads(stream.read(length).decode("utf-8"))
+    return header, _aligned(len(MAGIC) + 8 + length)
+
+
+def read_data(file, mmap_mode="r"):
+    """
+    Read the columns of data stored in a binary data file.
+
+    By default the arrays are memory-mapped: opening the file reads only its
+    header, and the pages of the arrays are read from the disk only when
+    they are used.
+
+    Parameters:
+        file (str, os.PathLike): the name of the file.
+        mmap_mode (str, default="r"): the mode of numpy.memmap ("r", "r+"
+            or "c"). If None the arrays are read into memory.
+
+    Returns:
+        columns (dict): the columns, by name, as DatumArray.
+        covariance (dict): the covariances of the columns which have one.
+        metadata (dict): the metadata stored with the data.
+    """
+    header, start = read_header(file)
+
+    def array(offset, shape):
+        if mmap_mode is None:
+            with open(file, "rb") as stream:
+                stream.seek(start + offset)
+                return np.fromfile(stream, dtype=_DTYPE,
+                                   count=int(np.prod(shape))).reshape(shape)
+        if not np.prod(shape):
+            return np.zeros(shape, dtype=_DTYPE)
+        return np.memmap(file, dtype=_DTYPE, mode=mmap_mode,
+                         offset=start + offset, shape=tuple(shape))
+
+    columns = {}
+    covariance = {}
+    for entry in header["columns"]:
+        # The arrays are wrapped without the conversions of the constructor,
+        # which would read (and copy) the whole file.
+        columns[entry["name"]] = DatumArray._new(
+            array(entry["value"], entry["shape"]),
+            array(entry["uncertainty"], entry["shape"]))
+        if entry["covariance"] is not None:
+            covariance[entry["name"]] = array(entry["covariance"],
+                                              entry["covariance_shape"])
+    return columns, covariance, header["metadata"]
+
+
+if __name__ == "__main__":
+    print("Hi, this is the DataFile library.\n\
+           It stores columns of data in a binary file which can be\
+           memory-mapped when it is read back.")
@@ -1,6 +1,37 @@
 """The required libraries."""
+import itertools
 import math
-from scipy.stats import norm, t
+from numbers import Real
+
+
+def _apply_ufunc(name, *arguments):
+    """
+    Apply a NumPy ufunc to arguments that are not scalars.
+
+    This function is used by the static functions of Datum when they receive
+    arrays. Lists of Datum and single Datum are converted to DatumArray, so
+    that the uncertainty of the whole array is propagated in one pass.
+
+    Parameters:
+        name (str): the name of the NumPy ufunc.
+        arguments: the arguments of the function.
+    """
+    import numpy as np
+    from DatumArray import DatumArray
+
+    converted = []
+    for argument in arguments:
+        if isinstance(argument, Datum):
+            argument = DatumArray(argument.value, argument.uncertainty)
+        elif (isinstance(argument, (list, tuple)) and argument
+              and isinstance(argument[0], Datum)):
+            argument = DatumArray.from_data(argument)
+        converted.append(argument)
+
+    return getattr(np, name)(*converted)
+
+
+_object_new = object.__new__
 
 
 class Datum:
@@ -10,6 +41,8 @@ class Datum:
     Every instance represents a single point of data.
     """
 
+    __slots__ = ("value", "uncertainty")
+
     def __init__(self, value, uncertainty=0.):
         """
         Initialize the class.
@@ -20,7 +53,9 @@ class Datum:
         """
         if not (isinstance(value, (float, int))
                 and isinstance(uncertainty, (float, int))):
-            raise TypeError
+            if not (isinstance(value, Real) and isinstance(uncertainty, Real)):
+                raise TypeError
+            value, uncertainty = float(value), float(uncertainty)
 
         self.value = value
         self.uncertainty = abs(uncertainty)
@@ -37,19 +72,24 @@ class Datum:
             other (Datum): the other Datum to sum.
             quadrature (bool): whether quadrature sum should be used.
         """
-        if isinstance(other, (float, int)):
-            return Datum(self.value + other, self.uncertainty)
+        if other.__class__ is not Datum:
+            other = _as_operand(other)
+            if other is None:
+                return NotImplemented
+            if not isinstance(other, Datum):
+                return _new(self.value + other, self.uncertainty)
 
-        if type(other) != type(self):
-            raise TypeError
+        if not quadrature:
+            return _new(self.value + other.value,
+                        self.uncertainty + other.uncertainty)
 
-        if quadrature:
-            return Datum(self.value + other.value,
-                         math.sqrt(self.uncertainty**2 + other.uncertainty**2
-                                   + 2.*covariance))
+        if covariance:
+            return _new(self.value + other.value,
+                        math.sqrt(self.uncertainty**2 + other.uncertainty**2
+                                  + 2.*covariance))
 
-        return Datum(self.value + other.value,
-                     self.uncertainty + other.uncertainty)
+        return _new(self.value + other.value,
+                    math.hypot(self.uncertainty, other.uncertainty))
 
     def __radd__(self, other, quadrature: bool = True, covariance=0.):
         """
@@ -79,19 +119,24 @@ class Datum:
             quadrature (bool, default True): whether quadrature sum should be
                 used.
         """
-        if isinstance(other, (float, int)):
-            return Datum(self.value - other, self.uncertainty)
+        if other.__class__ is not Datum:
+            other = _as_operand(other)
+            if other is None:
+                return NotImplemented
+            if not isinstance(other, Datum):
+                return _new(self.value - other, self.uncertainty)
 
-        if type(other) != type(self):
-            raise TypeError
+        if not quadrature:
+            return _new(self.value - other.value,
+                        self.uncertainty + other.uncertainty)
 
-        if quadrature:
-            return Datum(self.value - other.value,
-                         math.sqrt(self.uncertainty**2 + other.uncertainty**2
-                                   + 2*covariance))
+        if covariance:
+            return _new(self.value - other.value,
+                        math.sqrt(self.uncertainty**2 + other.uncertainty**2
+                                  - 2*covariance))
 
-        return Datum(self.value - other.value,
-                     self.uncertainty + other.uncertainty)
+        return _new(self.value - other.value,
+                    math.hypot(self.uncertainty, other.uncertainty))
 
     def __rsub__(self, other, quadrature: bool = True, covariance=0.):
         """
@@ -106,11 +151,12 @@ class Datum:
             quadrature (bool, default True): whether quadrature sum should be
                 used.
         """
-        if isinstance(other, (float, int)):
-            other = Datum(other)
+        other = _as_operand(other)
+        if other is None:
+            return NotImplemented
 
         if not isinstance(other, Datum):
-            raise TypeError
+            return _new(other - self.value, self.uncertainty)
 
         return other.__sub__(self, quadrature, covariance)
 
@@ -127,21 +173,27 @@ class Datum:
             quadrature (bool, default True): whether quadrature sum should be
                 used.
         """
-        if isinstance(other, (float, int)):
-            return Datum(self.value * other, self.uncertainty * abs(other))
-
-        if not isinstance(other, Datum):
-            raise TypeError
-
-        if quadrature:
-            return Datum(self.value * other.value,
-                         math.sqrt((self.uncertainty*other.value)**2
-                                   + (self.value*other.uncertainty)**2
-                                   + 2*covariance*self.value*other.value))
-
-        return Datum(self.value * other.value,
-                     self.uncertainty*other.value +
-                     self.value*other.uncertainty)
+        if other.__class__ is not Datum:
+            other = _as_operand(other)
+            if other is None:
+                return NotImplemented
+            if not isinstance(other, Datum):
+                return _new(self.value * other, self.uncertainty * abs(other))
+
+        if not quadrature:
+            return _new(self.value * other.value,
+                        abs(self.uncertainty*other.value +
+                            self.value*other.uncertainty))
+
+        if covariance:
+            return _new(self.value * other.value,
+                        math.sqrt((self.uncertainty*other.value)**2
+                                  + (self.value*other.uncertainty)**2
+                                  + 2*covariance*self.value*other.value))
+
+        return _new(self.value * other.value,
+                    math.hypot(self.uncertainty*other.value,
+                               self.value*other.uncertainty))
 
     def __rmul__(self, other, quadrature: bool = True, covariance=0.):
         """
@@ -171,22 +223,28 @@ class Datum:
             quadrature (bool, default True): whether quadrature sum should be
                 used.
         """
-        if isinstance(other, (float, int)):
-            return Datum(self.value / other, self.uncertainty / abs(other))
-
-        if not isinstance(other, Datum):
-            raise TypeError
-
-        if quadrature:
-            return Datum(self.value / other.value,
-                         math.sqrt((self.uncertainty/other.value)**2 +
-                                   (other.uncertainty*self.value /
-                                    other.value**2)**2 +
-                                   2*covariance*self.value/other.value**3))
-
-        return Datum(self.value / other.value,
-                     self.uncertainty/other.value +
-                     other.uncertainty*self.value/other.value**2)
+        if other.__class__ is not Datum:
+            other = _as_operand(other)
+            if other is None:
+                return NotImplemented
+            if not isinstance(other, Datum):
+                return _new(self.value / other, self.uncertainty / abs(other))
+
+        if not quadrature:
+            return _new(self.value / other.value,
+                        abs(self.uncertainty/other.value +
+                            other.uncertainty*self.value/other.value**2))
+
+        if covariance:
+            return _new(self.value / other.value,
+                        math.sqrt((self.uncertainty/other.value)**2 +
+                                  (other.uncertainty*self.value /
+                                   other.value**2)**2 -
+                                  2*covariance*self.value/other.value**3))
+
+        return _new(self.value / other.value,
+                    math.hypot(self.uncertainty/other.value,
+                               other.uncertainty*self.value/other.value**2))
 
     def __rtruediv__(self, other, quadrature: bool = True, covariance=0.):
         """
@@ -201,11 +259,13 @@ class Datum:
             quadrature (bool, default True): whether quadrature sum should be
                 used.
         """
-        if isinstance(other, (float, int)):
-            other = Datum(other)
+        other = _as_operand(other)
+        if other is None:
+            return NotImplemented
 
         if not isinstance(other, Datum):
-            raise TypeError
+            return _new(other / self.value,
+                        self.uncertainty*abs(other)/self.value**2)
 
         return other.__truediv__(self, quadrature, covariance)
 
@@ -217,6 +277,8 @@ class Datum:
         """
         if self.uncertainty==0.:
             return str(self.value)
+        if not math.isfinite(self.uncertainty):
+            return str(self.value) + " ± " + str(self.uncertainty)
         magnitude = math.floor(math.log10(self.uncertainty))
         if self.uncertainty//(10**magnitude) == 1:
             magnitude -= 1
@@ -233,23 +295,40 @@ class Datum:
 
     def __lt__(self, other):
         """Less than operator."""
-        if isinstance(other, (float, int)):
-            return self.value.__lt__(other)
+        if other.__class__ is Datum:
+            return self.value < other.value
 
-        if not isinstance(other, Datum):
-            raise TypeError
+        other = _as_operand(other)
+        if other is None:
+            return NotImplemented
 
-        return self.value.__lt__(other.value)
+        if isinstance(other, Datum):
+            return self.value < other.value
+        return self.value < other
 
     def __gt__(self, other):
         """Greater than operator."""
-        if isinstance(other, (float, int)):
-            return self.value.__gt__(other)
+        if other.__class__ is Datum:
+            return self.value > other.value
 
-        if not isinstance(other, Datum):
-            raise TypeError
+        other = _as_operand(other)
+        if other is None:
+            return NotImplemented
 
-        return self.value.__gt__(other.value)
+        if isinstance(other, Datum):
+            return self.value > other.value
+        return self.value > other
+
+    def _derive(self, value, derivative):
+        """
+        Return the result of a function of the datum.
+
+        Parameters:
+            value (float): the value of the function.
+            derivative (float): the derivative of the function, evaluated
+                in the value of the datum.
+        """
+        return _new(value, abs(derivative)*self.uncertainty)
 
     @staticmethod
     def sqrt(datum):
@@ -265,10 +344,10 @@ class Datum:
             return math.sqrt(datum)
 
         if not isinstance(datum, Datum):
-            raise TypeError
+            return _apply_ufunc("sqrt", datum)
 
-        return Datum(math.sqrt(datum.value),
-                     0.5*datum.uncertainty/math.sqrt(datum.value))
+        value = math.sqrt(datum.value)
+        return datum._derive(value, 0.5/value)
 
     @staticmethod
     def cbrt(datum):
@@ -282,10 +361,10 @@ class Datum:
             return math.cbrt(datum)
 
         if not isinstance(datum, Datum):
-            raise TypeError
+            return _apply_ufunc("cbrt", datum)
 
-        return Datum(math.cbrt(datum.value),
-                     1/3*datum.uncertainty/math.cbrt(datum.value**2))
+        value = math.cbrt(datum.value)
+        return datum._derive(value, 1/(3*value**2))
 
     @staticmethod
     def exp(datum):
@@ -299,10 +378,10 @@ class Datum:
             return math.exp(datum)
 
         if not isinstance(datum, Datum):
-            raise TypeError
+            return _apply_ufunc("exp", datum)
 
-        return Datum(math.exp(datum.value),
-                     datum.uncertainty*math.exp(datum.value))
+        value = math.exp(datum.value)
+        return datum._derive(value, value)
 
     @staticmethod
     def exp2(datum):
@@ -316,11 +395,10 @@ class Datum:
             return math.exp2(datum)
 
         if not isinstance(datum, Datum):
-            raise TypeError
+            return _apply_ufunc("exp2", datum)
 
-        return Datum(math.exp2(datum.value),
-                     datum.uncertainty*math.exp2(datum.value) *
-                     math.log(datum.value))
+        value = math.exp2(datum.value)
+        return datum._derive(value, value*math.log(2.0))
 
     @staticmethod
     def log(datum, base=False):
@@ -341,13 +419,14 @@ class Datum:
             return math.log(datum)
 
         if not isinstance(datum, Datum):
-            raise TypeError
+            if base:
+                return _apply_ufunc("log", datum) / math.log(base)
+            return _apply_ufunc("log", datum)
 
         if base:
-            return Datum(math.log(datum.value, base),
-                         datum.uncertainty/(datum.value*math.log(base)))
-        return Datum(math.log(datum.value),
-                     datum.uncertainty/(datum.value))
+            return datum._derive(math.log(datum.value, base),
+                                 1/(datum.value*math.log(base)))
+        return datum._derive(math.log(datum.value), 1/datum.value)
 
     @staticmethod
     def log2(datum):
@@ -361,10 +440,10 @@ class Datum:
             return math.log2(datum)
 
         if not isinstance(datum, Datum):
-            raise TypeError
+            return _apply_ufunc("log2", datum)
 
-        return Datum(math.log2(datum.value),
-                     datum.uncertainty/(datum.value*math.log(2.0)))
+        return datum._derive(math.log2(datum.value),
+                             1/(datum.value*math.log(2.0)))
 
     @staticmethod
     def log10(datum):
@@ -378,37 +457,43 @@ class Datum:
             return math.log10(datum)
 
         if not isinstance(datum, Datum):
-            raise TypeError
+            return _apply_ufunc("log10", datum)
 
-        return Datum(math.log10(datum.value),
-                     datum.uncertainty/(datum.value*math.log(10.0)))
+        return datum._derive(math.log10(datum.value),
+                             1/(datum.value*math.log(10.0)))
 
     @staticmethod
     def pow(base, exponent):
         """
-        Return the logarithm of x in base 10.
+        Return base raised to the power exponent.
 
         Parameters:
-            datum (Datum): the datum to be taken the logarithm.
+            base (Datum): the base of the power.
+            exponent (Datum): the exponent of the power.
         """
         if isinstance(base, (float, int)) and\
            isinstance(exponent, (float, int)):
             return math.pow(base, exponent)
 
-        if isinstance(base, (float, int)):
+        if not isinstance(base, Datum) and isinstance(base, Real):
             base = Datum(base)
 
-        if isinstance(exponent, (float, int)):
+        if not isinstance(exponent, Datum) and isinstance(exponent, Real):
             exponent = Datum(exponent)
 
         if not (isinstance(base, Datum) and isinstance(exponent, Datum)):
-            raise TypeError
+            return _apply_ufunc("power", base, exponent)
 
-        return Datum(math.pow(base.value, exponent.value),
-                     base.uncertainty * exponent.value *
-                     math.pow(base.value, exponent.value - 1)
-                     + exponent.uncertainty * math.log(exponent.value)
-                     * math.pow(base.value, exponent.value))
+        value = math.pow(base.value, exponent.value)
+        base_derivative = exponent.value *\
+            math.pow(base.value, exponent.value - 1)
+        # An exact exponent does not need the logarithm of the base, which
+        # is not defined for negative bases.
+        if not exponent.uncertainty:
+            return _combine(value, base, base_derivative, exponent, 0.)
+
+        return _combine(value, base, base_derivative,
+                        exponent, value*math.log(base.value))
 
     @staticmethod
     def acos(datum):
@@ -422,10 +507,10 @@ class Datum:
             return math.acos(datum)
 
         if not isinstance(datum, Datum):
-            raise TypeError
+            return _apply_ufunc("arccos", datum)
 
-        return Datum(math.acos(datum.value),
-                     datum.uncertainty/math.sqrt(1-datum.value**2))
+        return datum._derive(math.acos(datum.value),
+                             -1/math.sqrt(1-datum.value**2))
 
     @staticmethod
     def asin(datum):
@@ -439,10 +524,10 @@ class Datum:
             return math.asin(datum)
 
         if not isinstance(datum, Datum):
-            raise TypeError
+            return _apply_ufunc("arcsin", datum)
 
-        return Datum(math.asin(datum.value),
-                     datum.uncertainty/math.sqrt(1-datum.value**2))
+        return datum._derive(math.asin(datum.value),
+                             1/math.sqrt(1-datum.value**2))
 
     @staticmethod
     def atan(datum):
@@ -456,10 +541,10 @@ class Datum:
             return math.atan(datum)
 
         if not isinstance(datum, Datum):
-            raise TypeError
+            return _apply_ufunc("arctan", datum)
 
-        return Datum(math.atan(datum.value),
-                     datum.uncertainty/(1+datum.value**2))
+        return datum._derive(math.atan(datum.value),
+                             1/(1+datum.value**2))
 
     @staticmethod
     def atan2(opposite, adjacent):
@@ -474,17 +559,19 @@ class Datum:
                 adjacent, (float, int))):
             return math.atan2(opposite, adjacent)
 
-        if isinstance(opposite, (float, int)):
+        if not isinstance(opposite, Datum) and isinstance(opposite, Real):
             opposite = Datum(opposite)
 
-        if isinstance(adjacent, (float, int)):
+        if not isinstance(adjacent, Datum) and isinstance(adjacent, Real):
             adjacent = Datum(adjacent)
 
         if not (isinstance(opposite, Datum) and isinstance(adjacent, Datum)):
-            raise TypeError
+            return _apply_ufunc("arctan2", opposite, adjacent)
 
-        return Datum(math.atan2(opposite.value, adjacent.value),
-                     Datum.tan(opposite/adjacent).uncertainty)
+        squared_norm = opposite.value**2 + adjacent.value**2
+        return _combine(math.atan2(opposite.value, adjacent.value),
+                        opposite, adjacent.value/squared_norm,
+                        adjacent, -opposite.value/squared_norm)
 
     @staticmethod
     def cos(datum):
@@ -498,10 +585,9 @@ class Datum:
             return math.cos(datum)
 
         if not isinstance(datum, Datum):
-            raise TypeError
+            return _apply_ufunc("cos", datum)
 
-        return Datum(math.cos(datum.value),
-                     datum.uncertainty*math.sin(datum.value))
+        return datum._derive(math.cos(datum.value), -math.sin(datum.value))
 
     @staticmethod
     def sin(datum):
@@ -515,10 +601,9 @@ class Datum:
             return math.sin(datum)
 
         if not isinstance(datum, Datum):
-            raise TypeError
+            return _apply_ufunc("sin", datum)
 
-        return Datum(math.sin(datum.value),
-                     datum.uncertainty*math.cos(datum.value))
+        return datum._derive(math.sin(datum.value), math.cos(datum.value))
 
     @staticmethod
     def tan(datum):
@@ -532,10 +617,10 @@ class Datum:
             return math.tan(datum)
 
         if not isinstance(datum, Datum):
-            raise TypeError
+            return _apply_ufunc("tan", datum)
 
-        return Datum(math.tan(datum.value),
-                     datum.uncertainty/math.cos(datum.value)**2)
+        return datum._derive(math.tan(datum.value),
+                             1/math.cos(datum.value)**2)
 
     @staticmethod
     def degrees(datum):
@@ -549,10 +634,9 @@ class Datum:
             return math.degrees(datum)
 
         if not isinstance(datum, Datum):
-            raise TypeError
+            return _apply_ufunc("degrees", datum)
 
-        return Datum(math.degrees(datum.value),
-                     math.degrees(datum.uncertainty))
+        return datum._derive(math.degrees(datum.value), math.degrees(1.0))
 
     @staticmethod
     def radians(datum):
@@ -566,58 +650,82 @@ class Datum:
             return math.radians(datum)
 
         if not isinstance(datum, Datum):
-            raise TypeError
+            return _apply_ufunc("radians", datum)
 
-        return Datum(math.radians(datum.value),
-                     math.radians(datum.uncertainty))
+        return datum._derive(math.radians(datum.value), math.radians(1.0))
 
     @staticmethod
-    def normal_compatible(datum1, datum2, Z: bool = False):
+    def normal_compatible(datum1, datum2, Z: bool = False,
+                          fast: bool = False):
         """
         Perform a normal test.
 
         This function checks if two data are compatible performing a normal
-        test.
+        test. Both data can also be DatumArray: in this case the tests are
+        performed element by element in one vectorized call.
 
         Parameters:
             datum1 (Datum): the first datum.
             datum2 (Datum): the second datum.
             Z (bool, default=False): whether the function should return
                                      also the value of the normal variable.
+            fast (bool, default=False): whether the p-value should be
+                interpolated from a precomputed table, with relative error
+                below 1e-6, instead of calling scipy.stats. See PValues.
 
         Returs:
             pVal (float): the p-value of the result.
             Z (float, optional): the value of the normal variable.
         """
-        ZVal = (datum1.value-datum2.value)/math.sqrt(datum1.uncertainty**2
-                                                     + datum2.uncertainty**2)
-        pVal = norm.cdf(-abs(ZVal))*2
+        ZVal = (datum1.value-datum2.value)/(datum1.uncertainty**2
+                                            + datum2.uncertainty**2)**0.5
+        if fast:
+            from PValues import normal_pvalue
+
+            pVal = normal_pvalue(ZVal)
+        else:
+            from scipy.stats import norm
+
+            # The survival function keeps its accuracy far in the tails.
+            pVal = norm.sf(abs(ZVal))*2
 
         if Z:
             return pVal, ZVal
         return pVal
 
     @staticmethod
-    def student_compatible(datum1, datum2, tv: bool = False):
+    def student_compatible(datum1, datum2, dof, tv: bool = False,
+                           fast: bool = False):
         """
         Perform a student test.
 
         This function checks if two data are compatible performing a student
-        test.
+        test. Both data can also be DatumArray: in this case the tests are
+        performed element by element in one vectorized call.
 
         Parameters:
             datum1 (Datum): the first datum.
             datum2 (Datum): the second datum.
-            t (bool, default=False): whether the function should return
+            dof (float): the degrees of freedom of the student distribution.
+            tv (bool, default=False): whether the function should return
                                      also the value of the student variable.
+            fast (bool, default=False): whether the p-value should be
+                interpolated from a precomputed table, see normal_compatible.
 
         Returs:
             pVal (float): the p-value of the result.
             tv (float, optional): the value of the student variable.
         """
-        tVal = (datum1.value-datum2.value)/math.sqrt(datum1.uncertainty**2
-                                                     + datum2.uncertainty**2)
-        pVal = t.cdf(-abs(tVal))*2
+        tVal = (datum1.value-datum2.value)/(datum1.uncertainty**2
+                                            + datum2.uncertainty**2)**0.5
+        if fast:
+            from PValues import student_pvalue
+
+            pVal = student_pvalue(tVal, dof)
+        else:
+            from scipy.stats import t
+
+            pVal = t.sf(abs(tVal), dof)*2
 
         if tv:
             return pVal, tVal
@@ -630,16 +738,287 @@ class Datum:
 
         This function calculates the weighted mean of some data given
         inside a list. The mean is than returned as a Datum object.
+        The data are read only once, so data_list can also be a generator;
+        use WeightedMean to accumulate the mean of a stream piece by piece.
+
+        Parameters:
+            data_list ([Datum]): the list of data to be meaned. It can also
+                be a DatumArray or an iterable of chunks of data.
+        """
+        from WeightedMean import WeightedMean
+
+        return WeightedMean(data_list).result()
+
+    @staticmethod
+    def vectorize(function):
+        """
+        Turn a NumPy function into a function propagating the uncertainty.
+
+        This decorator lets any formula written with NumPy ufuncs and
+        arithmetic operators accept Datum and DatumArray. The derivatives are
+        computed with dual numbers (or finite differences, if the formula
+        uses something dual numbers do not support), the whole arrays at
+        once. See Dual.vectorize.
+
+        Parameters:
+            function (callable): the function to be vectorized.
+        """
+        from Dual import vectorize
+
+        return vectorize(function)
+
+    @staticmethod
+    def profile():
+        """
+        Return a profiler of the operations on Datum.
+
+        The profiler counts the calls and the time spent in every operator
+        and static function while it is running, e.g. inside a with
+        statement. See Profiler.
+        """
+        from Profiler import Profiler
+
+        return Profiler()
+
+
+class CorrelatedDatum(Datum):
+    """
+    A datum which keeps track of its correlations.
+
+    Every instance built with the constructor is an independent input.
+    Every instance obtained from the operators or from the static functions
+    of Datum stores the sparse gradient of its value with respect to the
+    independent inputs it depends on, each term already multiplied by the
+    uncertainty of the input. The uncertainty is then propagated exactly to
+    first order, including the correlations between data sharing some
+    inputs, and the memory scales with the number of inputs actually used.
+
+    Plain Datum used together with a CorrelatedDatum are considered new
+    independent inputs. Since the covariances are known, the quadrature and
+    covariance arguments of the operators are ignored.
+    """
+
+    __slots__ = ("gradient",)
+
+    def __init__(self, value, uncertainty=0.):
+        """
+        Initialize the class.
 
         Parameters:
-            data_list ([Datum]): the list of data to be meaned.
+            value (float): the best esitmate of the data.
+            uncertainty (float): the uncertainty of the data.
         """
-        num = 0
-        den = 0
-        for i in data_list:
-            num += (i.value/(i.uncertainty**2))
-            den += (1/(i.uncertainty**2))
-        return Datum(num/den, math.sqrt(1/den))
+        super().__init__(value, uncertainty)
+        self.gradient = {next(_input_keys): self.uncertainty}\
+            if self.uncertainty else {}
+
+    def __add__(self, other, quadrature: bool = True, covariance=0.):
+        """Addition operator, tracking the correlations."""
+        other = _as_operand(other)
+        if other is None:
+            return NotImplemented
+
+        if isinstance(other, Datum):
+            return _combine(self.value + other.value, self, 1., other, 1.)
+        return self._derive(self.value + other, 1.)
+
+    def __radd__(self, other, quadrature: bool = True, covariance=0.):
+        """Reversed addition operator, tracking the correlations."""
+        return self.__add__(other)
+
+    def __sub__(self, other, quadrature: bool = True, covariance=0.):
+        """Subtraction operator, tracking the correlations."""
+        other = _as_operand(other)
+        if other is None:
+            return NotImplemented
+
+        if isinstance(other, Datum):
+            return _combine(self.value - other.value, self, 1., other, -1.)
+        return self._derive(self.value - other, 1.)
+
+    def __rsub__(self, other, quadrature: bool = True, covariance=0.):
+        """Reversed subtraction operator, tracking the correlations."""
+        other = _as_operand(other)
+        if other is None:
+            return NotImplemented
+
+        if isinstance(other, Datum):
+            return _combine(other.value - self.value, other, 1., self, -1.)
+        return self._derive(other - self.value, -1.)
+
+    def __mul__(self, other, quadrature: bool = True, covariance=0.):
+        """Multiplication operator, tracking the correlations."""
+        other = _as_operand(other)
+        if other is None:
+            return NotImplemented
+
+        if isinstance(other, Datum):
+            return _combine(self.value * other.value,
+                            self, other.value, other, self.value)
+        return self._derive(self.value * other, other)
+
+    def __rmul__(self, other, quadrature: bool = True, covariance=0.):
+        """Reversed multiplication operator, tracking the correlations."""
+        return self.__mul__(other)
+
+    def __truediv__(self, other, quadrature: bool = True, covariance=0.):
+        """Division operator, tracking the correlations."""
+        other = _as_operand(other)
+        if other is None:
+            return NotImplemented
+
+        if isinstance(other, Datum):
+            value = self.value / other.value
+            return _combine(value, self, 1/other.value,
+                            other, -value/other.value)
+        return self._derive(self.value / other, 1/other)
+
+    def __rtruediv__(self, other, quadrature: bool = True, covariance=0.):
+        """Reversed division operator, tracking the correlations."""
+        other = _as_operand(other)
+        if other is None:
+            return NotImplemented
+
+        if isinstance(other, Datum):
+            value = other.value / self.value
+            return _combine(value, other, 1/self.value,
+                            self, -value/self.value)
+        value = other / self.value
+        return self._derive(value, -value/self.value)
+
+    def _derive(self, value, derivative):
+        """
+        Return the result of a function of the datum.
+
+        Parameters:
+            value (float): the value of the function.
+            derivative (float): the derivative of the function, evaluated
+                in the value of the datum.
+        """
+        return _new_correlated(value, {key: derivative*contribution
+                                       for key, contribution
+                                       in self.gradient.items()})
+
+    @staticmethod
+    def covariance(datum1, datum2):
+        """
+        Return the covariance of two data.
+
+        Parameters:
+            datum1 (CorrelatedDatum): the first datum.
+            datum2 (CorrelatedDatum): the second datum.
+        """
+        if datum1 is datum2:
+            return datum1.uncertainty**2
+
+        if not (isinstance(datum1, CorrelatedDatum)
+                and isinstance(datum2, CorrelatedDatum)):
+            return 0.
+
+        if len(datum2.gradient) < len(datum1.gradient):
+            datum1, datum2 = datum2, datum1
+        return math.fsum(contribution*datum2.gradient[key] for
+                         key, contribution in datum1.gradient.items()
+                         if key in datum2.gradient)
+
+    @staticmethod
+    def correlation(datum1, datum2):
+        """
+        Return the correlation coefficient of two data.
+
+        Parameters:
+            datum1 (CorrelatedDatum): the first datum.
+            datum2 (CorrelatedDatum): the second datum.
+        """
+        return CorrelatedDatum.covariance(datum1, datum2) /\
+            (datum1.uncertainty*datum2.uncertainty)
+
+
+def _new(value, uncertainty):
+    """
+    Create a Datum skipping the checks of the constructor.
+
+    This function is used by the operators, whose results are already
+    known to be valid numbers with a non negative uncertainty.
+    """
+    datum = _object_new(Datum)
+    datum.value = value
+    datum.uncertainty = uncertainty
+    return datum
+
+
+def _as_operand(other):
+    """
+    Return other as an operand for the operators of Datum.
+
+    Data and Python numbers are returned as they are, the other real numbers
+    (e.g. NumPy scalars) are converted to float. If other is not supported,
+    None is returned.
+    """
+    if isinstance(other, (Datum, float, int)):
+        return other
+
+    if isinstance(other, Real):
+        return float(other)
+
+    return None
+
+
+def _combine(value, first, first_derivative, second, second_derivative):
+    """
+    Return the result of a function of two data.
+
+    The uncertainty is propagated with the quadrature sum, unless one of the
+    data is a CorrelatedDatum: in that case the correlations are tracked.
+
+    Parameters:
+        value (float): the value of the function.
+        first (Datum): the first argument of the function.
+        first_derivative (float): the partial derivative of the function
+            with respect to the first argument.
+        second (Datum): the second argument of the function.
+        second_derivative (float): the partial derivative of the function
+            with respect to the second argument.
+    """
+    if isinstance(first, CorrelatedDatum) or\
+       isinstance(second, CorrelatedDatum):
+        gradient = {key: first_derivative*contribution for key, contribution
+                    in _gradient(first).items()}
+        for key, contribution in _gradient(second).items():
+            gradient[key] = gradient.get(key, 0.) +\
+                second_derivative*contribution
+        return _new_correlated(value, gradient)
+
+    return _new(value, math.hypot(first_derivative*first.uncertainty,
+                                  second_derivative*second.uncertainty))
+
+
+# The keys identifying the independent inputs of the CorrelatedDatum.
+_input_keys = itertools.count()
+
+
+def _gradient(datum):
+    """
+    Return the sparse gradient of a datum.
+
+    A Datum which is not a CorrelatedDatum is considered a new independent
+    input, uncorrelated with everything else.
+    """
+    if isinstance(datum, CorrelatedDatum):
+        return datum.gradient
+
+    if not datum.uncertainty:
+        return {}
+    return {next(_input_keys): datum.uncertainty}
+
+
+def _new_correlated(value, gradient):
+    """Create a CorrelatedDatum from its value and its gradient."""
+    datum = _object_new(CorrelatedDatum)
+    datum.value = value
+    datum.gradient = gradient
+    datum.uncertainty = math.hypot(*gradient.values())
+    return datum
 
 
 if __name__ == "__main__":
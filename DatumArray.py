@@ -0,0 +1,682 @@
+"""The required libraries."""
+import numpy as np
+import Kernels
+from Datum import Datum
+
+
+# The derivatives of the supported ufuncs of one argument, as functions of
+# the argument x and of the result y of the ufunc.
+UNARY_DERIVATIVES = {
+    np.negative: lambda x, y: -1.,
+    np.positive: lambda x, y: 1.,
+    np.absolute: lambda x, y: np.sign(x),
+    np.square: lambda x, y: 2.*x,
+    np.reciprocal: lambda x, y: -y**2,
+    np.sqrt: lambda x, y: 0.5/y,
+    np.cbrt: lambda x, y: 1./(3.*y**2),
+    np.exp: lambda x, y: y,
+    np.exp2: lambda x, y: y*np.log(2.),
+    np.expm1: lambda x, y: y + 1.,
+    np.log: lambda x, y: 1./x,
+    np.log2: lambda x, y: 1./(x*np.log(2.)),
+    np.log10: lambda x, y: 1./(x*np.log(10.)),
+    np.log1p: lambda x, y: 1./(1. + x),
+    np.sin: lambda x, y: np.cos(x),
+    np.cos: lambda x, y: -np.sin(x),
+    np.tan: lambda x, y: 1. + y**2,
+    np.arcsin: lambda x, y: 1./np.sqrt(1. - x**2),
+    np.arccos: lambda x, y: -1./np.sqrt(1. - x**2),
+    np.arctan: lambda x, y: 1./(1. + x**2),
+    np.sinh: lambda x, y: np.cosh(x),
+    np.cosh: lambda x, y: np.sinh(x),
+    np.tanh: lambda x, y: 1. - y**2,
+    np.degrees: lambda x, y: 180./np.pi,
+    np.rad2deg: lambda x, y: 180./np.pi,
+    np.radians: lambda x, y: np.pi/180.,
+    np.deg2rad: lambda x, y: np.pi/180.,
+}
+
+# The partial derivatives of the supported ufuncs of two arguments, as
+# functions of the arguments x1, x2 and of the result y of the ufunc.
+BINARY_DERIVATIVES = {
+    np.add: (lambda x1, x2, y: 1.,
+             lambda x1, x2, y: 1.),
+    np.subtract: (lambda x1, x2, y: 1.,
+                  lambda x1, x2, y: -1.),
+    np.multiply: (lambda x1, x2, y: x2,
+                  lambda x1, x2, y: x1),
+    np.true_divide: (lambda x1, x2, y: 1./x2,
+                     lambda x1, x2, y: -y/x2),
+    np.power: (lambda x1, x2, y: x2*np.power(x1, x2 - 1.),
+               lambda x1, x2, y: y*np.log(x1)),
+    np.arctan2: (lambda x1, x2, y: x2/(x1**2 + x2**2),
+                 lambda x1, x2, y: -x1/(x1**2 + x2**2)),
+    np.hypot: (lambda x1, x2, y: x1/y,
+               lambda x1, x2, y: x2/y),
+}
+
+
+class DatumArray:
+    """
+    A column of data.
+
+    Every instance represents many points of data at once, stored as two
+    contiguous float64 arrays: one for the values and one for the
+    uncertainties. The operators propagate the uncertainty of the whole
+    column in a single NumPy pass, with the same rules used by Datum.
+    """
+
+    def __init__(self, value, uncertainty=0.):
+        """
+        Initialize the class.
+
+        Parameters:
+            value (array_like): the best estimates of the data.
+            uncertainty (array_like, default=0.): the uncertainties of the
+                data. It is broadcast against value.
+        """
+        value = np.asarray(value, dtype=np.float64)
+        uncertainty = np.abs(np.asarray(uncertainty, dtype=np.float64))
+        if value.shape != uncertainty.shape:
+            value, uncertainty = (np.array(array) for array in
+                                  np.broadcast_arrays(value, uncertainty))
+
+        self.value = value
+        self.uncertainty = uncertainty
+
+    @classmethod
+    def _new(cls, value, uncertainty):
+        """
+        Create an instance from already computed arrays.
+
+        This function skips the conversions done by the constructor and it is
+        used internally to wrap the results of the operations.
+        """
+        if np.shape(value) != np.shape(uncertainty):
+            value, uncertainty = (np.array(array) for array in
+                                  np.broadcast_arrays(value, uncertainty))
+        array = object.__new__(cls)
+        array.value = value
+        array.uncertainty = uncertainty
+        return array
+
+    @staticmethod
+    def _operand(other):
+        """
+        Split an operand into its value and its uncertainty.
+
+        The uncertainty is None for exact numbers and arrays.
+        The function returns None if the operand is not supported.
+        """
+        if isinstance(other, (DatumArray, Datum)):
+            return other.value, other.uncertainty
+
+        if isinstance(other, (float, int, np.number, np.ndarray, list)):
+            return np.asarray(other, dtype=np.float64), None
+
+        return None
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """
+        Apply a NumPy ufunc to the array.
+
+        This function lets np.sqrt, np.sin, np.power, ... work on DatumArray:
+        the values are computed by the ufunc and the uncertainties are
+        propagated with the derivatives of the ufunc, the whole array at once.
+        Only the ufuncs listed in UNARY_DERIVATIVES and BINARY_DERIVATIVES
+        are supported.
+        When the kernels are enabled and the array has at least
+        Kernels.MIN_SIZE data, sqrt, exp, log, sin and cos use Kernels.unary.
+        Otherwise the NumPy ufuncs are used, whose exp and log can differ in
+        the last bits, so these results can depend on whether the kernels
+        are used.
+        """
+        if method != "__call__" or kwargs:
+            return NotImplemented
+
+        operands = [DatumArray._operand(operand) for operand in inputs]
+        if any(operand is None for operand in operands):
+            return NotImplemented
+
+        values = [operand[0] for operand in operands]
+        if len(inputs) == 1 and ufunc in UNARY_DERIVATIVES:
+            (value, uncertainty), = operands
+            if ufunc in Kernels.UNARY_CODES\
+                    and Kernels.available(value.size):
+                result = np.empty(value.shape)
+                result_uncertainty = np.empty(value.shape)
+                Kernels.unary(Kernels.UNARY_CODES[ufunc],
+                              np.ascontiguousarray(value).ravel(),
+                              np.ascontiguousarray(uncertainty).ravel(),
+                              result.reshape(-1),
+                              result_uncertainty.reshape(-1))
+                return DatumArray._new(result, result_uncertainty)
+
+            result = ufunc(value)
+            return DatumArray._new(result, np.abs(
+                UNARY_DERIVATIVES[ufunc](value, result) * uncertainty))
+
+        if len(inputs) == 2 and ufunc in BINARY_DERIVATIVES:
+            result = ufunc(*values)
+            variance = 0.
+            for derivative, (_, uncertainty) in zip(
+                    BINARY_DERIVATIVES[ufunc], operands):
+                if uncertainty is None:
+                    continue
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    term = derivative(*values, result) * uncertainty
+                # An exact operand does not contribute, even where the
+                # derivative is not defined (e.g. log of a negative base).
+                variance = variance + np.where(uncertainty == 0., 0., term**2)
+            return DatumArray._new(result, np.sqrt(variance))
+
+        return NotImplemented
+
+    @staticmethod
+    def from_data(data_list):
+        """
+        Build a DatumArray from some data.
+
+        Parameters:
+            data_list ([Datum]): the data to be collected in the array.
+        """
+        data_list = list(data_list)
+        return DatumArray([datum.value for datum in data_list],
+                          [datum.uncertainty for datum in data_list])
+
+    def to_data(self):
+        """Return the content of the array as a list of Datum."""
+        return [Datum(value, uncertainty) for value, uncertainty
+                in zip(self.value.ravel().tolist(),
+                       self.uncertainty.ravel().tolist())]
+
+    @property
+    def shape(self):
+        """The shape of the array."""
+        return self.value.shape
+
+    @property
+    def size(self):
+        """The number of data in the array."""
+        return self.value.size
+
+    def __len__(self):
+        """Return the number of data along the first axis."""
+        return len(self.value)
+
+    def __iter__(self):
+        """Iterate over the data along the first axis."""
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(self, key):
+        """
+        Index the array.
+
+        A single element is returned as a Datum, anything else as a
+        DatumArray.
+        """
+        value = self.value[key]
+        uncertainty = self.uncertainty[key]
+        if np.ndim(value) == 0:
+            return Datum(float(value), float(uncertainty))
+        return DatumArray._new(value, uncertainty)
+
+    def __setitem__(self, key, other):
+        """
+        Assign some elements of the array.
+
+        Parameters:
+            other (Datum, DatumArray, float): the new data.
+        """
+        operand = DatumArray._operand(other)
+        if operand is None:
+            raise TypeError
+
+        value, uncertainty = operand
+        self.value[key] = value
+        self.uncertainty[key] = 0. if uncertainty is None else uncertainty
+
+    def __add__(self, other, quadrature: bool = True, covariance=0.):
+        """
+        Addition operator.
+
+        This function adds two data arrays propagating the unceartainty.
+        If quadrature is set to true, to propagate the uncertainty the
+        quadrature sum will be used.
+
+        Parameters:
+            other (DatumArray, Datum, array_like): the other data to sum.
+            quadrature (bool, default True): whether quadrature sum should be
+                used.
+            covariance (array_like, default=0.): the covariance between the
+                two operands.
+        """
+        operand = DatumArray._operand(other)
+        if operand is None:
+            return NotImplemented
+
+        value, uncertainty = operand
+        if uncertainty is None:
+            return DatumArray._new(self.value + value, self.uncertainty)
+
+        if quadrature:
+            return DatumArray._new(self.value + value,
+                                   np.sqrt(self.uncertainty**2
+                                           + uncertainty**2
+                                           + 2.*covariance))
+
+        return DatumArray._new(self.value + value,
+                               self.uncertainty + uncertainty)
+
+    def __radd__(self, other, quadrature: bool = True, covariance=0.):
+        """
+        Reversed addition operator.
+
+        Parameters:
+            other (DatumArray, Datum, array_like): the other data to sum.
+            quadrature (bool, default True): whether quadrature sum should be
+                used.
+            covariance (array_like, default=0.): the covariance between the
+                two operands.
+        """
+        return self.__add__(other, quadrature, covariance)
+
+    def __sub__(self, other, quadrature: bool = True, covariance=0.):
+        """
+        Subtraction operator.
+
+        Parameters:
+            other (DatumArray, Datum, array_like): the other data to
+                subtract.
+            quadrature (bool, default True): whether quadrature sum should be
+                used.
+            covariance (array_like, default=0.): the covariance between the
+                two operands.
+        """
+        operand = DatumArray._operand(other)
+        if operand is None:
+            return NotImplemented
+
+        value, uncertainty = operand
+        if uncertainty is None:
+            return DatumArray._new(self.value - value, self.uncertainty)
+
+        if quadrature:
+            return DatumArray._new(self.value - value,
+                                   np.sqrt(self.uncertainty**2
+                                           + uncertainty**2
+                                           - 2.*covariance))
+
+        return DatumArray._new(self.value - value,
+                               self.uncertainty + uncertainty)
+
+    def __rsub__(self, other, quadrature: bool = True, covariance=0.):
+        """
+        Reversed subtraction operator.
+
+        Parameters:
+            other (DatumArray, Datum, array_like): the data from which to
+                subtract.
+            quadrature (bool, default True): whether quadrature sum should be
+                used.
+            covariance (array_like, default=0.): the covariance between the
+                two operands.
+        """
+        operand = DatumArray._operand(other)
+        if operand is None:
+            return NotImplemented
+
+        value, uncertainty = operand
+        if uncertainty is None:
+            uncertainty = np.zeros_like(value)
+        return DatumArray._new(value, uncertainty).__sub__(self, quadrature,
+                                                           covariance)
+
+    def __mul__(self, other, quadrature: bool = True, covariance=0.):
+        """
+        Multiplication operator.
+
+        Parameters:
+            other (DatumArray, Datum, array_like): the other data to
+                multiply.
+            quadrature (bool, default True): whether quadrature sum should be
+                used.
+            covariance (array_like, default=0.): the covariance between the
+                two operands.
+        """
+        operand = DatumArray._operand(other)
+        if operand is None:
+            return NotImplemented
+
+        value, uncertainty = operand
+        if uncertainty is None:
+            return DatumArray._new(self.value * value,
+                                   self.uncertainty * np.abs(value))
+
+        if quadrature:
+            return DatumArray._new(self.value * value,
+                                   np.sqrt((self.uncertainty*value)**2
+                                           + (self.value*uncertainty)**2
+                                           + 2.*covariance*self.value*value))
+
+        return DatumArray._new(self.value * value,
+                               np.abs(self.uncertainty*value
+                                      + self.value*uncertainty))
+
+    def __rmul__(self, other, quadrature: bool = True, covariance=0.):
+        """
+        Reversed multiplication operator.
+
+        Parameters:
+            other (DatumArray, Datum, array_like): the other data to
+                multiply.
+            quadrature (bool, default True): whether quadrature sum should be
+                used.
+            covariance (array_like, default=0.): the covariance between the
+                two operands.
+        """
+        return self.__mul__(other, quadrature, covariance)
+
+    def __truediv__(self, other, quadrature: bool = True, covariance=0.):
+        """
+        Division operator.
+
+        Parameters:
+            other (DatumArray, Datum, array_like): the divisor.
+            quadrature (bool, default True): whether quadrature sum should be
+                used.
+            covariance (array_like, default=0.): the covariance between the
+                two operands.
+        """
+        operand = DatumArray._operand(other)
+        if operand is None:
+            return NotImplemented
+
+        value, uncertainty = operand
+        if uncertainty is None:
+            return DatumArray._new(self.value / value,
+                                   self.uncertainty / np.abs(value))
+
+        if quadrature:
+            return DatumArray._new(self.value / value,
+                                   np.sqrt((self.uncertainty/value)**2
+                                           + (uncertainty*self.value
+                                              / value**2)**2
+                                           - 2.*covariance*self.value
+                                           / value**3))
+
+        return DatumArray._new(self.value / value,
+                               np.abs(self.uncertainty/value
+                                      + uncertainty*self.value/value**2))
+
+    def __rtruediv__(self, other, quadrature: bool = True, covariance=0.):
+        """
+        Reversed division operator.
+
+        Parameters:
+            other (DatumArray, Datum, array_like): the dividend.
+            quadrature (bool, default True): whether quadrature sum should be
+                used.
+            covariance (array_like, default=0.): the covariance between the
+                two operands.
+        """
+        operand = DatumArray._operand(other)
+        if operand is None:
+            return NotImplemented
+
+        value, uncertainty = operand
+        if uncertainty is None:
+            uncertainty = np.zeros_like(value)
+        return DatumArray._new(value, uncertainty).__truediv__(self,
+                                                               quadrature,
+                                                               covariance)
+
+    def __lt__(self, other):
+        """Less than operator, element by element on the values."""
+        operand = DatumArray._operand(other)
+        if operand is None:
+            return NotImplemented
+
+        return self.value < operand[0]
+
+    def __gt__(self, other):
+        """Greater than operator, element by element on the values."""
+        operand = DatumArray._operand(other)
+        if operand is None:
+            return NotImplemented
+
+        return self.value > operand[0]
+
+    def compatibility_matrix(self, dof=None, statistic: bool = False):
+        """
+        Check the compatibility of every pair of data in the array.
+
+        This function performs the normal test (or the student test, if the
+        degrees of freedom are given) between every pair of data of a one
+        dimensional array, in one vectorized call.
+
+        Parameters:
+            dof (float, default=None): if given, the degrees of freedom of
+                the student test.
+            statistic (bool, default=False): whether the function should
+                return also the matrix of the normal (or student) variables.
+
+        Returns:
+            pVal (numpy.ndarray): the N×N matrix of the p-values.
+            statistic (numpy.ndarray, optional): the N×N matrix of the normal
+                (or student) variables.
+        """
+        from scipy.stats import norm, t
+
+        if self.value.ndim != 1:
+            raise ValueError("The array must be one dimensional.")
+
+        variance = self.uncertainty**2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            variable = (self.value[:, None] - self.value[None, :])\
+                / np.sqrt(variance[:, None] + variance[None, :])
+        # Every datum is compatible with itself, also when it is exact.
+        np.fill_diagonal(variable, 0.)
+
+        if dof is None:
+            pVal = norm.sf(np.abs(variable))*2
+        else:
+            pVal = t.sf(np.abs(variable), dof)*2
+
+        if statistic:
+            return pVal, variable
+        return pVal
+
+    @staticmethod
+    def _chunked_sum(function, arrays, chunk_size):
+        """
+        Sum the results of function over the arrays, one chunk at a time.
+
+        NumPy sums every chunk pairwise and the partial sums are summed
+        pairwise again, so the rounding error grows only with the logarithm
+        of the size, and the temporary arrays are bounded by chunk_size.
+        """
+        size = len(arrays[0])
+        if size <= chunk_size:
+            return float(np.sum(function(*arrays)))
+        return float(np.sum([np.sum(function(*(array[start:start + chunk_size]
+                                               for array in arrays)))
+                             for start in range(0, size, chunk_size)]))
+
+    @staticmethod
+    def _correlated_terms(weights, covariance, banded):
+        """
+        Return the terms of the variance of a linear combination due to the
+        covariances between the data.
+
+        The j-th term is weights[j]*Σ_{i<j} weights[i]*covariance[i, j], so
+        the variance of the combination is Σ (weights*uncertainty)**2 plus
+        twice the sum of the terms, and the variance of its partial sums is
+        obtained with a cumulative sum.
+        """
+        covariance = np.asarray(covariance, dtype=np.float64)
+        size = len(weights)
+        if banded:
+            if covariance.ndim != 2 or covariance.shape[1] != size:
+                raise ValueError("Invalid shape of the covariance bands.")
+            terms = np.zeros(size)
+            for distance, band in enumerate(covariance[:size - 1], 1):
+                terms[distance:] += weights[:-distance]*band[:-distance]
+            return weights*terms
+
+        if covariance.shape != (size, size):
+            raise ValueError("Invalid shape of the covariance matrix.")
+        return weights*(weights @ np.triu(covariance, 1))
+
+    def _combination(self, weights, covariance, banded, chunk_size):
+        """
+        Return the linear combination of the data with some exact weights.
+
+        The data are taken in the order of ravel.
+        """
+        value = self.value.ravel()
+        uncertainty = self.uncertainty.ravel()
+        weights = np.broadcast_to(np.asarray(weights, dtype=np.float64),
+                                  value.shape)
+
+        result = DatumArray._chunked_sum(np.multiply, (weights, value),
+                                         chunk_size)
+        variance = DatumArray._chunked_sum(
+            lambda weight, sigma: (weight*sigma)**2, (weights, uncertainty),
+            chunk_size)
+        if covariance is not None:
+            variance += 2.*float(np.sum(DatumArray._correlated_terms(
+                weights, covariance, banded)))
+        return result, variance
+
+    def sum(self, covariance=None, banded: bool = False,
+            chunk_size: int = 65536):
+        """
+        Return the sum of the data.
+
+        The uncertainty is propagated in one vectorized pass, with pairwise
+        summation, instead of rounding it through a square root at every
+        addition like the builtin sum of many Datum.
+
+        Parameters:
+            covariance (array_like, default=None): the covariances between
+                the data, taken in the order of ravel. It is the N×N
+                covariance matrix, of which only the upper triangle is read
+                since the variances are the squared uncertainties, or, if
+                banded is True, a K×N array whose k-th row holds the
+                covariances between the data i and i+k+1 at position i.
+                If not given the data are independent.
+            banded (bool, default=False): whether covariance holds bands.
+            chunk_size (int, default=65536): the number of data processed
+                at once.
+
+        Returns:
+            sum (Datum): the sum of the data.
+        """
+        result, variance = self._combination(1., covariance, banded,
+                                             chunk_size)
+        return Datum(result, float(np.sqrt(variance)))
+
+    def mean(self, covariance=None, banded: bool = False,
+             chunk_size: int = 65536):
+        """
+        Return the arithmetic mean of the data.
+
+        For the mean weighted with the uncertainties, see WeightedMean.
+
+        Parameters:
+            covariance (array_like, default=None): the covariances between
+                the data, see sum.
+            banded (bool, default=False): whether covariance holds bands.
+            chunk_size (int, default=65536): the number of data processed
+                at once.
+
+        Returns:
+            mean (Datum): the mean of the data.
+        """
+        if not self.size:
+            raise ValueError("The array is empty.")
+
+        result, variance = self._combination(1., covariance, banded,
+                                             chunk_size)
+        return Datum(result/self.size, float(np.sqrt(variance))/self.size)
+
+    def dot(self, other, covariance=None, banded: bool = False,
+            chunk_size: int = 65536):
+        """
+        Return the dot product of the data with some other data.
+
+        Parameters:
+            other (DatumArray, array_like): the other factor, with the same
+                number of elements. If it is a DatumArray, its data are
+                considered independent of these ones.
+            covariance (array_like, default=None): the covariances between
+                the data of this array, see sum.
+            banded (bool, default=False): whether covariance holds bands.
+            chunk_size (int, default=65536): the number of data processed
+                at once.
+
+        Returns:
+            product (Datum): the dot product.
+        """
+        operand = DatumArray._operand(other)
+        if operand is None or isinstance(other, Datum):
+            raise TypeError("The other factor must be an array.")
+
+        weights = np.ravel(operand[0])
+        if weights.size != self.size:
+            raise ValueError("The arrays have different sizes.")
+
+        result, variance = self._combination(weights, covariance, banded,
+                                             chunk_size)
+        if operand[1] is not None:
+            variance += DatumArray._chunked_sum(
+                lambda value, sigma: (value*sigma)**2,
+                (self.value.ravel(), np.ravel(operand[1])), chunk_size)
+        return Datum(result, float(np.sqrt(variance)))
+
+    def cumsum(self, covariance=None, banded: bool = False):
+        """
+        Return the cumulative sums of the data.
+
+        Parameters:
+            covariance (array_like, default=None): the covariances between
+                the data, see sum.
+            banded (bool, default=False): whether covariance holds bands.
+
+        Returns:
+            sums (DatumArray): the one dimensional array of the partial
+                sums, in the order of ravel.
+        """
+        variance = self.uncertainty.ravel()**2
+        if covariance is not None:
+            variance = variance + 2.*DatumArray._correlated_terms(
+                np.ones(self.size), covariance, banded)
+        return DatumArray._new(np.cumsum(self.value.ravel()),
+                               np.sqrt(np.cumsum(variance)))
+
+    def __repr__(self):
+        """
+        Represent the array.
+
+        This function creates a string representing the object.
+        """
+        return "DatumArray(value=" + repr(self.value) + ", uncertainty="\
+            + repr(self.uncertainty) + ")"
+
+    def __str__(self):
+        """
+        Convert the array into a string.
+
+        Every element is written with the same rule used by Datum.
+        """
+        if self.value.ndim == 0:
+            return str(Datum(float(self.value), float(self.uncertainty)))
+        return "[" + ", ".join(str(datum) for datum in self) + "]"
+
+
+if __name__ == "__main__":
+    print("Hi, this is the array version of the Datum class.\n\
+           It stores many data as two arrays of values and uncertainties\
+           and propagates the uncertainty of the whole column at once.")
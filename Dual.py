@@ -0,0 +1,232 @@
+"""The required libraries."""
+import functools
+import numpy as np
+from Datum import Datum
+from DatumArray import DatumArray, UNARY_DERIVATIVES, BINARY_DERIVATIVES
+
+
+class Dual:
+    """
+    A dual number for forward-mode differentiation.
+
+    Every instance carries some values and, for each input of the
+    computation, the derivatives of the values with respect to that input.
+    The NumPy ufuncs listed in the derivative tables of DatumArray, and the
+    operators, propagate the derivatives with the chain rule, the whole
+    array at once.
+    """
+
+    __slots__ = ("value", "derivatives")
+
+    def __init__(self, value, derivatives):
+        """
+        Initialize the class.
+
+        Parameters:
+            value (array_like): the values.
+            derivatives (array_like): the derivatives of the values. The
+                last axis runs over the inputs of the computation, so that
+                it never interferes with the broadcasting of the values.
+        """
+        self.value = np.asarray(value, dtype=np.float64)
+        self.derivatives = np.asarray(derivatives, dtype=np.float64)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """
+        Apply a NumPy ufunc propagating the derivatives.
+
+        Unsupported ufuncs make NumPy raise a TypeError.
+        """
+        if method != "__call__" or kwargs:
+            return NotImplemented
+
+        values = [argument.value if isinstance(argument, Dual)
+                  else np.asarray(argument, dtype=np.float64)
+                  for argument in inputs]
+        if len(inputs) == 1 and ufunc in UNARY_DERIVATIVES:
+            result = ufunc(values[0])
+            return Dual(result, _partial(UNARY_DERIVATIVES[ufunc](
+                values[0], result)) * inputs[0].derivatives)
+
+        if len(inputs) == 2 and ufunc in BINARY_DERIVATIVES:
+            result = ufunc(*values)
+            derivatives = 0.
+            for derivative, argument in zip(BINARY_DERIVATIVES[ufunc],
+                                            inputs):
+                if isinstance(argument, Dual):
+                    derivatives = derivatives\
+                        + _partial(derivative(*values, result))\
+                        * argument.derivatives
+            return Dual(result, derivatives)
+
+        return NotImplemented
+
+    def __add__(self, other):
+        """Addition operator."""
+        return np.add(self, other)
+
+    def __radd__(self, other):
+        """Reversed addition operator."""
+        return np.add(other, self)
+
+    def __sub__(self, other):
+        """Subtraction operator."""
+        return np.subtract(self, other)
+
+    def __rsub__(self, other):
+        """Reversed subtraction operator."""
+        return np.subtract(other, self)
+
+    def __mul__(self, other):
+        """Multiplication operator."""
+        return np.multiply(self, other)
+
+    def __rmul__(self, other):
+        """Reversed multiplication operator."""
+        return np.multiply(other, self)
+
+    def __truediv__(self, other):
+        """Division operator."""
+        return np.true_divide(self, other)
+
+    def __rtruediv__(self, other):
+        """Reversed division operator."""
+        return np.true_divide(other, self)
+
+    def __pow__(self, other):
+        """Power operator."""
+        return np.power(self, other)
+
+    def __rpow__(self, other):
+        """Reversed power operator."""
+        return np.power(other, self)
+
+    def __neg__(self):
+        """Negation operator."""
+        return np.negative(self)
+
+    def __abs__(self):
+        """Absolute value."""
+        return np.absolute(self)
+
+    def __lt__(self, other):
+        """Less than operator, on the values."""
+        return self.value < getattr(other, "value", other)
+
+    def __gt__(self, other):
+        """Greater than operator, on the values."""
+        return self.value > getattr(other, "value", other)
+
+    def __repr__(self):
+        """
+        Represent the dual number.
+
+        This function creates a string representing the object.
+        """
+        return "Dual(value=" + repr(self.value) + ", derivatives="\
+            + repr(self.derivatives) + ")"
+
+
+def _partial(derivative):
+    """Add the axis of the inputs to a partial derivative."""
+    return np.asarray(derivative, dtype=np.float64)[..., None]
+
+
+def _forward(function, values, uncertain):
+    """
+    Return the values and the gradient of function with dual numbers.
+
+    Only the arguments whose index is in uncertain are differentiated.
+    """
+    arguments = list(values)
+    for column, index in enumerate(uncertain):
+        seed = np.zeros(values[index].shape + (len(uncertain),))
+        seed[..., column] = 1.
+        arguments[index] = Dual(values[index], seed)
+
+    result = function(*arguments)
+    if not isinstance(result, Dual):
+        result = np.asarray(result, dtype=np.float64)
+        return result, np.zeros((len(uncertain),) + result.shape)
+    return result.value, np.moveaxis(
+        np.broadcast_to(result.derivatives,
+                        result.value.shape + (len(uncertain),)), -1, 0)
+
+
+def _finite_differences(function, values, uncertain, uncertainties):
+    """
+    Return the values and the gradient of function with central differences.
+
+    The step of every argument is scaled on its value and its uncertainty.
+    """
+    result = np.asarray(function(*values), dtype=np.float64)
+    gradient = []
+    for index in uncertain:
+        step = np.cbrt(np.finfo(np.float64).eps)\
+            * np.maximum(np.abs(values[index]), uncertainties[index])
+        step = np.where(step > 0., step, 1.)
+        forward, backward = list(values), list(values)
+        forward[index] = values[index] + step
+        backward[index] = values[index] - step
+        gradient.append((np.asarray(function(*forward), dtype=np.float64)
+                         - np.asarray(function(*backward), dtype=np.float64))
+                        / (2.*step))
+    if not gradient:
+        return result, np.zeros((0,) + result.shape)
+    return result, np.array(np.broadcast_arrays(*gradient))
+
+
+def vectorize(function):
+    """
+    Turn a NumPy function into a function propagating the uncertainty.
+
+    The returned function accepts Datum, DatumArray, numbers and arrays. The
+    derivatives of function are computed in forward mode with dual numbers
+    or, if function uses operations which dual numbers do not support (it
+    raises a TypeError), with central finite differences. The uncertainties
+    of the arguments are propagated with the quadrature sum, considering
+    them independent, and the whole arrays are evaluated in one batch.
+
+    Parameters:
+        function (callable): a function of some arrays, built from NumPy
+            ufuncs and arithmetic operators.
+
+    Returns:
+        propagating (callable): the propagating function. It returns a Datum
+            if the result is a single value, a DatumArray otherwise.
+    """
+    @functools.wraps(function)
+    def propagating(*arguments):
+        values, uncertainties = [], []
+        for argument in arguments:
+            if isinstance(argument, (Datum, DatumArray)):
+                values.append(np.asarray(argument.value, dtype=np.float64))
+                uncertainties.append(np.asarray(argument.uncertainty,
+                                                dtype=np.float64))
+            else:
+                values.append(np.asarray(argument, dtype=np.float64))
+                uncertainties.append(np.zeros_like(values[-1]))
+        uncertain = [index for index, uncertainty in enumerate(uncertainties)
+                     if np.any(uncertainty)]
+
+        try:
+            result, gradient = _forward(function, values, uncertain)
+        except TypeError:
+            result, gradient = _finite_differences(function, values,
+                                                   uncertain, uncertainties)
+
+        variance = np.zeros_like(result)
+        for row, index in enumerate(uncertain):
+            variance = variance + (gradient[row]*uncertainties[index])**2
+
+        if np.ndim(result) == 0:
+            return Datum(float(result), float(np.sqrt(variance)))
+        return DatumArray(result, np.sqrt(variance))
+
+    return propagating
+
+
+if __name__ == "__main__":
+    print("Hi, this is the Dual library.\n\
+           It differentiates NumPy functions in forward mode to propagate\
+           the uncertainty through any formula at array speed.")
@@ -0,0 +1,253 @@
+"""The required libraries."""
+import csv
+import itertools
+import json
+import math
+import os
+import numpy as np
+import Instruments
+from WeightedMean import WeightedMean
+
+
+# The columns of a log: the time of every reading, the reading, the full
+# scale of the range selected on the instrument and the frequency. Only the
+# readings are required.
+COLUMNS = ("timestamp", "reading", "range", "frequency")
+
+
+def _number(value):
+    """Convert a field to a float, NaN if it is not a number."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _floats(values, strict=False):
+    """
+    Convert a list of strings or numbers to floats.
+
+    The missing values are NaN, and so are the fields which are not numbers,
+    e.g. the "OL" logged by an overloaded meter, unless strict is True: then
+    they raise a ValueError. A NaN reading is flagged as over range by the
+    conversion.
+    """
+    try:
+        return np.array([np.nan if value is None or value == "" else value
+                         for value in values], dtype=np.float64)
+    except (TypeError, ValueError):
+        if strict:
+            raise ValueError("The fields are not all numbers.")
+        return np.array([_number(value) for value in values],
+                        dtype=np.float64)
+
+
+def _timestamps(values):
+    """
+    Convert a list of timestamps to an array.
+
+    Numbers become floats and ISO 8601 dates become datetime64, anything
+    else is kept as strings.
+    """
+    try:
+        return _floats(values, strict=True)
+    except ValueError:
+        pass
+    try:
+        return np.array(values, dtype="datetime64[ns]")
+    except ValueError:
+        return np.array(values, dtype=str)
+
+
+def _chunk(records, fields):
+    """
+    Build a chunk of a log from some records, given as lists of fields.
+
+    The short records, e.g. CSV rows without their trailing fields, are
+    padded with missing values, so they do not truncate the columns.
+    """
+    width = len(fields)
+    records = [record if len(record) >= width
+               else list(record) + [""]*(width - len(record))
+               for record in records]
+    columns = dict(zip(fields, zip(*records))) if records else {}
+    chunk = {}
+    for name in COLUMNS:
+        values = columns.get(name)
+        if values is None:
+            continue
+        chunk[name] = _timestamps(list(values)) if name == "timestamp"\
+            else _floats(values)
+    if "reading" not in chunk:
+        raise ValueError("The log has no reading column.")
+    return chunk
+
+
+def read_log(file, chunk_size=65536, format=None):
+    """
+    Read a log of an instrument, one chunk at a time.
+
+    The log is a CSV file with a header, or a JSON lines file with one
+    object per reading, with the columns of COLUMNS: only the reading is
+    required, the missing values are NaN. Only one chunk of lines is in
+    memory at a time, so a log of any length is read in constant memory.
+
+    Parameters:
+        file (str, os.PathLike): the path of the log.
+        chunk_size (int, default=65536): the number of readings of a chunk.
+        format (str, default=None): "csv" or "jsonl". By default it is
+            deduced from the extension of the file, CSV unless it is
+            ".jsonl", ".ndjson" or ".json".
+
+    Yields:
+        chunk (dict): the arrays of the columns of a chunk of readings.
+    """
+    if format is None:
+        extension = os.path.splitext(os.fspath(file))[1].lower()
+        format = "jsonl" if extension in (".jsonl", ".ndjson", ".json")\
+            else "csv"
+    if format not in ("csv", "jsonl"):
+        raise ValueError("Unknown log format " + repr(format) + ".")
+
+    with open(file, newline="", encoding="utf-8") as stream:
+        if format == "csv":
+            reader = csv.reader(stream)
+            fields = [field.strip() for field in next(reader, [])]
+            records = (row for row in reader if row)
+        else:
+            fields = COLUMNS
+            records = ([record.get(name) for name in COLUMNS]
+                       for record in (json.loads(line) for line in stream
+                                      if line.strip()))
+        while True:
+            chunk = list(itertools.islice(records, chunk_size))
+            if not chunk:
+                return
+            yield _chunk(chunk, fields)
+
+
+def measure(chunks, instrument, freq=None, **options):
+    """
+    Convert the readings of every chunk with the model of an instrument.
+
+    The readings that cannot be converted are flagged, not raised, see
+    Instruments.InstrumentSpec.validate_array. Every chunk gains the data,
+    the mask of the valid readings and their reason codes.
+
+    Parameters:
+        chunks (iterable): the chunks, e.g. from read_log.
+        instrument (str, InstrumentSpec): the instrument, or the name of a
+            registered instrument, e.g. "keysightU1733C_capacitance".
+        freq (float, default=None): the frequency of the readings without
+            one in the log.
+        options: the sensitivity options, e.g. x2sens=True.
+
+    Yields:
+        chunk (dict): the chunks, with the keys "data", "valid" and
+            "reasons".
+    """
+    if not isinstance(instrument, Instruments.InstrumentSpec):
+        instrument = Instruments.get(instrument)
+
+    for chunk in chunks:
+        frequency = chunk.get("frequency")
+        if frequency is None:
+            frequency = freq
+        elif freq is not None:
+            frequency = np.where(np.isnan(frequency), freq, frequency)
+        elif np.isnan(frequency).all():
+            frequency = None
+        data, valid, reasons = instrument.measure_array(
+            chunk["reading"], frequency, True, chunk.get("range"), **options)
+        chunk.update(data=data, valid=valid, reasons=reasons)
+        yield chunk
+
+
+def propagate(chunks, function):
+    """
+    Apply a function to the data of every chunk.
+
+    The data whose result is not finite, e.g. the logarithm of a negative
+    reading, are no longer valid: their reason code becomes
+    Instruments.PROPAGATION_FAILED.
+
+    Parameters:
+        chunks (iterable): the chunks, e.g. from measure.
+        function (callable): the function, applied to the DatumArray of the
+            data of a chunk with the operators, the NumPy ufuncs or the
+            static functions of Datum. It must work element by element.
+
+    Yields:
+        chunk (dict): the chunks, whose data are replaced by the results.
+    """
+    for chunk in chunks:
+        with np.errstate(invalid="ignore", divide="ignore",
+                         over="ignore"):
+            data = function(chunk["data"])
+        failed = chunk["valid"] & ~(np.isfinite(data.value)
+                                    & np.isfinite(data.uncertainty))
+        if failed.any():
+            chunk["valid"] = chunk["valid"] & ~failed
+            chunk["reasons"][failed] = Instruments.PROPAGATION_FAILED
+        chunk["data"] = data
+        yield chunk
+
+
+def accumulate(chunks, mean):
+    """
+    Add the valid data of every chunk to a weighted mean.
+
+    Parameters:
+        chunks (iterable): the chunks, e.g. from measure or propagate.
+        mean (WeightedMean): the accumulator.
+
+    Yields:
+        chunk (dict): the chunks, unchanged.
+    """
+    for chunk in chunks:
+        data, valid = chunk["data"], chunk["valid"]
+        mean.add_arrays(data.value[valid], data.uncertainty[valid])
+        yield chunk
+
+
+def ingest(file, instrument, function=None, freq=None, chunk_size=65536,
+           format=None, **options):
+    """
+    Convert a log of an instrument and compute its weighted mean.
+
+    This function chains read_log, measure, propagate and accumulate, so
+    the log is processed one chunk at a time.
+
+    Parameters:
+        file (str, os.PathLike): the path of the log, see read_log.
+        instrument (str, InstrumentSpec): the instrument, see measure.
+        function (callable, default=None): if given, the function applied
+            to the data before the mean, see propagate.
+        freq (float, default=None): the frequency of the readings without
+            one in the log.
+        chunk_size (int, default=65536): the number of readings of a chunk.
+        format (str, default=None): the format of the log, see read_log.
+        options: the sensitivity options, e.g. x2sens=True.
+
+    Returns:
+        mean (Datum): the weighted mean of the valid data, None if no datum
+            is valid.
+        counts (numpy.ndarray): the number of readings of every reason
+            code, see Instruments.REASONS.
+    """
+    chunks = measure(read_log(file, chunk_size, format), instrument, freq,
+                     **options)
+    if function is not None:
+        chunks = propagate(chunks, function)
+    mean = WeightedMean()
+    counts = np.zeros(len(Instruments.REASONS), dtype=np.int64)
+    for chunk in accumulate(chunks, mean):
+        counts += np.bincount(chunk["reasons"].ravel(),
+                              minlength=len(Instruments.REASONS))
+    return (mean.result() if mean.count else None), counts
+
+
+if __name__ == "__main__":
+    print("Hi, this is the Ingestion library.\n\
+           It converts the logs of the instruments into data, one chunk at\
+           a time.")
@@ -0,0 +1,551 @@
+"""The required libraries."""
+import os
+from bisect import bisect_right
+from Datum import Datum
+
+
+# The reason codes of the readings that cannot be converted, and their
+# descriptions.
+# PROPAGATION_FAILED is set by Ingestion.propagate, for the data whose
+# propagated value or uncertainty is not finite.
+OK, OVER_RANGE, INVALID_FREQUENCY, UNSUPPORTED_RANGE, PROPAGATION_FAILED\
+    = range(5)
+REASONS = ("ok", "over range", "invalid frequency",
+           "range not available at this frequency", "propagation failed")
+
+# The file with the specifications of the instruments of MeasureMeans.
+SPECIFICATIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              "instruments.json")
+
+
+def _table(values, rows, columns, name):
+    """
+    Expand a term of the specifications to one tuple per frequency.
+
+    Parameters:
+        values (float, list): a number, used for every range, a list with
+            one number per range, or a list of such lists, one per
+            frequency. None marks a range that is not available.
+        rows, columns (int): the number of frequencies and of ranges.
+        name (str): the name of the term, for the errors.
+    """
+    if values is None or not isinstance(values, (list, tuple)):
+        values = [values]*columns
+    if not values or not isinstance(values[0], (list, tuple)):
+        values = [values]*rows
+    if len(values) != rows or any(len(row) != columns for row in values):
+        raise ValueError("The " + name + " must have one value per range"
+                         " and, optionally, per frequency.")
+    return tuple(tuple(None if value is None else float(value)
+                       for value in row) for row in values)
+
+
+class InstrumentSpec:
+    """
+    The specifications of the uncertainty of an instrument.
+
+    The range of a reading x is the first one whose full scale, i.e. its
+    upper bound, exceeds |x|, and the uncertainty of the reading is
+        percent*|x|/100 + quadratic*x**2/1e6 + offset + full_scale*bound/100
+    with the coefficients of its range. Every coefficient can depend on the
+    range and on the frequency, given as a list of exact frequencies or as
+    the edges of some frequency bands, and a null percentage or offset marks
+    a range that is not available at a frequency. The sensitivity options,
+    such as the x2sens button of the SuperTester, multiply the bounds.
+
+    The specifications are compiled once into tuples, searched with bisect
+    for a single reading, and into read-only NumPy arrays for the arrays of
+    readings, built the first time they are needed.
+    """
+
+    def __init__(self, name, quantity, ranges, percent=0., offset=0.,
+                 quadratic=None, full_scale=None, frequencies=None,
+                 frequency_bands=None, sensitivities=None):
+        """
+        Initialize the class, compiling the specifications.
+
+        Parameters:
+            name (str): the name of the instrument and of the measure.
+            quantity (str): the symbol of the quantity, for the errors.
+            ranges (list): the upper bounds of the ranges, sorted, or one
+                such list per frequency.
+            percent, offset (float, list, default=0.): the percentage of the
+                reading and the offset of the uncertainty, see _table.
+            quadratic (float, list, default=None): the coefficient of the
+                square of the reading, in millionths.
+            full_scale (float, list, default=None): the percentage of the
+                full scale of the range.
+            frequencies (list, default=None): the supported frequencies.
+            frequency_bands (list, default=None): the edges of the supported
+                frequency bands, sorted, as an alternative to frequencies.
+            sensitivities (dict, default=None): the multiplier of the bounds
+                of every sensitivity option.
+        """
+        if frequencies is not None and frequency_bands is not None:
+            raise ValueError("Give either the frequencies or the bands.")
+
+        self.name = name
+        self.quantity = quantity
+        self.frequencies = None if frequencies is None else tuple(
+            float(frequency) for frequency in frequencies)
+        self.frequency_bands = None if frequency_bands is None else tuple(
+            float(edge) for edge in frequency_bands)
+        self.sensitivities = dict(sensitivities or {})
+        if self.frequencies is not None:
+            rows = len(self.frequencies)
+            self._rows = {frequency: row for row, frequency
+                          in enumerate(self.frequencies)}
+        elif self.frequency_bands is not None:
+            rows = len(self.frequency_bands) - 1
+            if rows < 1 or list(self.frequency_bands)\
+                    != sorted(self.frequency_bands):
+                raise ValueError("The frequency bands must be sorted.")
+        else:
+            rows = 1
+
+        if ranges and isinstance(ranges[0], (list, tuple)):
+            columns = len(ranges[0])
+        else:
+            columns = len(ranges)
+        self.bounds = _table(ranges, rows, columns, "ranges")
+        if any(None in row or list(row) != sorted(row)
+               for row in self.bounds):
+            raise ValueError("The ranges must be sorted numbers.")
+        self.percent = _table(percent, rows, columns, "percent")
+        self.offset = _table(offset, rows, columns, "offset")
+        self.quadratic = None if quadratic is None else _table(
+            quadratic, rows, columns, "quadratic")
+        self.full_scale = None if full_scale is None else _table(
+            full_scale, rows, columns, "full_scale")
+
+        # The coefficients of every range, in one tuple per range for the
+        # scalar lookups: None if the range is not available.
+        self._coefficients = tuple(
+            tuple(None if percent[column] is None or offset[column] is None
+                  else (percent[column], offset[column],
+                        None if quadratic is None else quadratic[column],
+                        None if full_scale is None else full_scale[column])
+                  for column in range(columns))
+            for percent, offset, quadratic, full_scale in zip(
+                self.percent, self.offset,
+                self.quadratic or [None]*rows, self.full_scale or [None]*rows))
+        self._scaled = {1.: self.bounds}
+        self._arrays = {}
+
+    def _row(self, freq):
+        """Return the index of the row of the tables of a frequency."""
+        if self.frequencies is not None:
+            row = self._rows.get(freq)
+            if row is None:
+                raise ValueError("Invalid frequency value.")
+            return row
+        if self.frequency_bands is not None:
+            if freq is None:
+                raise ValueError("Invalid frequency value.")
+            row = bisect_right(self.frequency_bands, freq) - 1
+            if not 0 <= row < len(self.frequency_bands) - 1:
+                raise ValueError("Invalid frequency value.")
+            return row
+        return 0
+
+    def _multiplier(self, options):
+        """Return the multiplier of the bounds of some sensitivity options."""
+        multiplier = 1.
+        for option, enabled in options.items():
+            factor = self.sensitivities.get(option)
+            if factor is None:
+                raise TypeError(self.name + " has no sensitivity option "
+                                + repr(option) + ".")
+            if enabled:
+                multiplier *= factor
+        return multiplier
+
+    def _bounds(self, multiplier):
+        """Return the bounds of the ranges scaled by a multiplier."""
+        bounds = self._scaled.get(multiplier)
+        if bounds is None:
+            bounds = tuple(tuple(bound*multiplier for bound in row)
+                           for row in self.bounds)
+            self._scaled[multiplier] = bounds
+        return bounds
+
+    def measure(self, x, freq=None, **options):
+        """
+        Return a reading with its uncertainty.
+
+        Parameters:
+            x (float): the reading.
+            freq (float, default=None): the frequency of the measure.
+            options: the sensitivity options, e.g. x2sens=True.
+
+        Returns:
+            x (Datum): the reading with its uncertainty.
+        """
+        # This is the path of every function of MeasureMeans, so the lookup
+        # of the row is inlined for the instruments without frequency.
+        if self.frequencies is None and self.frequency_bands is None:
+            row = 0
+        else:
+            row = self._row(freq)
+        if options:
+            multiplier = self._multiplier(options)
+            bounds = (self._scaled.get(multiplier)
+                      or self._bounds(multiplier))[row]
+        else:
+            bounds = self.bounds[row]
+        magnitude = abs(x)
+        index = bisect_right(bounds, magnitude)
+        if index == len(bounds):
+            raise ValueError("Invalid value of " + self.quantity
+                             + ". Exceedes the range.")
+        coefficients = self._coefficients[row][index]
+        if coefficients is None:
+            raise ValueError("Invalid value of " + self.quantity
+                             + ". Exceedes the range for this frequency.")
+        percent, offset, quadratic, full_scale = coefficients
+        uncertainty = percent*magnitude/100.
+        if quadratic is not None:
+            uncertainty += quadratic*magnitude*magnitude/1e6
+        uncertainty += offset
+        if full_scale is not None:
+            uncertainty += full_scale*bounds[index]/100.
+        return Datum(x, uncertainty)
+
+    def uncertainty(self, x, freq=None, **options):
+        """
+        Return the uncertainty of a reading.
+
+        Parameters:
+            x (float): the reading.
+            freq (float, default=None): the frequency of the measure.
+            options: the sensitivity options, e.g. x2sens=True.
+        """
+        return self.measure(x, freq, **options).uncertainty
+
+    def arrays(self, multiplier=1.):
+        """
+        Return the tables as read-only NumPy arrays.
+
+        The arrays have one row per frequency and one column per range, the
+        missing coefficients are NaN.
+
+        Parameters:
+            multiplier (float, default=1.): the multiplier of the bounds.
+
+        Returns:
+            arrays (dict): the arrays of the bounds and of the coefficients.
+        """
+        arrays = self._arrays.get(multiplier)
+        if arrays is not None:
+            return arrays
+
+        import numpy as np
+
+        arrays = {}
+        for name, table in (("bounds", self._bounds(multiplier)),
+                            ("percent", self.percent),
+                            ("offset", self.offset),
+                            ("quadratic", self.quadratic),
+                            ("full_scale", self.full_scale)):
+            if table is None:
+                continue
+            array = np.array([[np.nan if value is None else value
+                               for value in row] for row in table])
+            array.flags.writeable = False
+            arrays[name] = array
+        self._arrays[multiplier] = arrays
+        return arrays
+
+    def _rows_of(self, freq, shape):
+        """
+        Return the rows of the tables of some frequencies.
+
+        The row of an invalid frequency is -1. The result is an int when
+        the frequency is one for all the readings.
+        """
+        import numpy as np
+
+        if np.ndim(freq) == 0:
+            try:
+                return self._row(None if freq is None else float(freq))
+            except ValueError:
+                return -1
+
+        freq = np.broadcast_to(np.asarray(freq, dtype=np.float64), shape)
+        if self.frequencies is not None:
+            rows = np.full(shape, -1, dtype=np.intp)
+            for row, frequency in enumerate(self.frequencies):
+                rows[freq == frequency] = row
+        elif self.frequency_bands is not None:
+            rows = np.searchsorted(self.frequency_bands, freq,
+                                   side="right") - 1
+            rows[rows >= len(self.frequency_bands) - 1] = -1
+        else:
+            rows = np.zeros(shape, dtype=np.intp)
+        return rows
+
+    def validate_array(self, x, freq=None, selected_range=None, **options):
+        """
+        Compute the uncertainties of some readings, flagging the invalid ones.
+
+        The range of every reading is found with a binary search over the
+        bounds of its frequency and the uncertainties are computed in one
+        NumPy pass. The readings that cannot be converted do not stop the
+        conversion: their uncertainty is NaN and their reason code tells
+        why, see REASONS.
+
+        Parameters:
+            x (array_like): the readings.
+            freq (float, array_like, default=None): the frequency of the
+                measures, one for all or one per reading.
+            selected_range (float, array_like, default=None): the full scale
+                of the range selected on the instrument, one for all or one
+                per reading, if it was not chosen automatically. NaN selects
+                the automatic range, the smallest containing the reading.
+            options: the sensitivity options, e.g. x2sens=True.
+
+        Returns:
+            x (numpy.ndarray): the readings, as a float array.
+            uncertainty (numpy.ndarray): the uncertainties.
+            reasons (numpy.ndarray): the reason code of every reading, OK
+                for the valid ones.
+        """
+        import numpy as np
+        import Kernels
+
+        x = np.asarray(x, dtype=np.float64)
+        magnitude = np.abs(x)
+        arrays = self.arrays(self._multiplier(options))
+        bounds = arrays["bounds"]
+        columns = bounds.shape[1]
+        reasons = np.zeros(x.shape, dtype=np.int8)
+        rows = self._rows_of(freq, x.shape)
+        invalid_frequency = None
+        if np.ndim(rows) == 0:
+            if rows < 0:
+                reasons[...] = INVALID_FREQUENCY
+                return x, np.full(x.shape, np.nan), reasons
+            indices = Kernels.lookup_ranges(bounds[rows], magnitude)
+        else:
+            indices = np.full(x.shape, columns, dtype=np.intp)
+            for row in np.unique(rows[rows >= 0]):
+                selected = rows == row
+                indices[selected] = Kernels.lookup_ranges(
+                    bounds[row], magnitude[selected])
+            invalid_frequency = rows < 0
+            rows = np.maximum(rows, 0)
+
+        # NaN readings are over range too, as they are after every bound.
+        over_range = indices == columns
+        if selected_range is not None:
+            indices, over_range, unknown = self._select(
+                bounds, rows, indices, over_range,
+                np.broadcast_to(np.asarray(selected_range, dtype=np.float64),
+                                x.shape))
+            reasons[unknown] = UNSUPPORTED_RANGE
+        if over_range.any():
+            reasons[over_range] = OVER_RANGE
+            indices = np.minimum(indices, columns - 1)
+        percent = arrays["percent"][rows, indices]
+        offset = arrays["offset"][rows, indices]
+        uncertainty = percent*magnitude/100.
+        if "quadratic" in arrays:
+            uncertainty += arrays["quadratic"][rows, indices]\
+                * magnitude*magnitude/1e6
+        uncertainty += offset
+        if "full_scale" in arrays:
+            uncertainty += arrays["full_scale"][rows, indices]\
+                * bounds[rows, indices]/100.
+
+        # The missing coefficients make the uncertainty NaN.
+        invalid = np.isnan(uncertainty)
+        if invalid.any():
+            reasons[invalid & (reasons == OK)] = UNSUPPORTED_RANGE
+        if invalid_frequency is not None:
+            reasons[invalid_frequency] = INVALID_FREQUENCY
+        if reasons.any():
+            uncertainty[reasons != OK] = np.nan
+        return x, uncertainty, reasons
+
+    @staticmethod
+    def _select(bounds, rows, indices, over_range, selected_range):
+        """
+        Replace the automatic ranges with the selected ones.
+
+        A reading is over range if it exceeds its selected range, and the
+        selected ranges that are not ranges of the instrument are unknown.
+
+        Returns:
+            indices (numpy.ndarray): the index of the range of every reading.
+            over_range (numpy.ndarray): the mask of the readings over range.
+            unknown (numpy.ndarray): the mask of the unknown ranges.
+        """
+        import numpy as np
+
+        columns = bounds.shape[1]
+        indices = indices.copy()
+        over_range = over_range.copy()
+        unknown = np.zeros(indices.shape, dtype=bool)
+        selected = ~np.isnan(selected_range)
+        rows = np.broadcast_to(rows, indices.shape)
+        for row in np.unique(rows[selected]):
+            chosen = selected & (rows == row)
+            full_scale = selected_range[chosen]
+            index = np.minimum(np.searchsorted(bounds[row],
+                                               full_scale*(1 - 1e-9)),
+                               columns - 1)
+            known = np.isclose(bounds[row][index], full_scale, rtol=1e-9,
+                               atol=0.)
+            over_range[chosen] |= known & (indices[chosen] > index)
+            unknown[chosen] = ~known
+            indices[chosen] = index
+        return indices, over_range & ~unknown, unknown
+
+    def _error(self, reasons):
+        """Return the error raised for the invalid readings of a conversion."""
+        for reason in (INVALID_FREQUENCY, OVER_RANGE, UNSUPPORTED_RANGE):
+            if (reasons == reason).any():
+                break
+        if reason == INVALID_FREQUENCY:
+            return ValueError("Invalid frequency value.")
+        if reason == OVER_RANGE:
+            return ValueError("Invalid value of " + self.quantity
+                              + ". Exceedes the range.")
+        return ValueError("Invalid value of " + self.quantity
+                          + ". Exceedes the range for this frequency.")
+
+    def uncertainty_array(self, x, freq=None, selected_range=None,
+                          **options):
+        """
+        Return the uncertainties of some readings.
+
+        Parameters:
+            x (array_like): the readings.
+            freq (float, array_like, default=None): the frequency of the
+                measures, one for all or one per reading.
+            selected_range (float, array_like, default=None): the full scale
+                of the selected ranges, see validate_array.
+            options: the sensitivity options, e.g. x2sens=True.
+
+        Returns:
+            uncertainty (numpy.ndarray): the uncertainties.
+
+        Raises:
+            ValueError: if any reading is invalid, see validate_array.
+        """
+        _, uncertainty, reasons = self.validate_array(x, freq, selected_range,
+                                                      **options)
+        if reasons.any():
+            raise self._error(reasons)
+        return uncertainty
+
+    def measure_array(self, x, freq=None, masked=False, selected_range=None,
+                      **options):
+        """
+        Return some readings with their uncertainties.
+
+        Parameters:
+            x (array_like): the readings.
+            freq (float, array_like, default=None): the frequency of the
+                measures, one for all or one per reading.
+            masked (bool, default=False): whether the invalid readings are
+                flagged instead of raising a ValueError.
+            selected_range (float, array_like, default=None): the full scale
+                of the selected ranges, see validate_array.
+            options: the sensitivity options, e.g. x2sens=True.
+
+        Returns:
+            x (DatumArray): the readings with their uncertainties, NaN for
+                the invalid ones.
+            valid (numpy.ndarray): only if masked, the mask of the valid
+                readings.
+            reasons (numpy.ndarray): only if masked, the reason code of
+                every reading, see REASONS.
+        """
+        from DatumArray import DatumArray
+
+        x, uncertainty, reasons = self.validate_array(x, freq, selected_range,
+                                                      **options)
+        if masked:
+            return DatumArray._new(x, uncertainty), reasons == OK, reasons
+        if reasons.any():
+            raise self._error(reasons)
+        return DatumArray._new(x, uncertainty)
+
+    def __repr__(self):
+        """
+        Represent the specifications.
+
+        This function creates a string representing the object.
+        """
+        return "InstrumentSpec(" + repr(self.name) + ", "\
+            + str(len(self.bounds[0])) + " ranges, "\
+            + str(len(self.bounds)) + " frequencies)"
+
+
+# The registered instruments, by name. The instruments of SPECIFICATIONS are
+# loaded the first time one of them is requested.
+REGISTRY = {}
+_loaded = False
+
+
+def load(file):
+    """
+    Compile the specifications of a file.
+
+    The file is a JSON object mapping the name of every instrument to the
+    keyword arguments of InstrumentSpec, e.g.
+        {"meter_DCvoltage": {"quantity": "V", "ranges": [2, 20, 200],
+                             "percent": 0.5, "offset": [1e-3, 1e-2, 1e-1]}}
+
+    Parameters:
+        file (str): the path of the file.
+
+    Returns:
+        specs (dict): the compiled specifications, by name.
+    """
+    import json
+
+    with open(file, encoding="utf-8") as stream:
+        specifications = json.load(stream)
+    return {name: InstrumentSpec(name, **specification)
+            for name, specification in specifications.items()}
+
+
+def register(spec):
+    """
+    Register an instrument, replacing any with the same name.
+
+    Parameters:
+        spec (InstrumentSpec, str): the specifications, or the path of a file
+            of specifications to be registered at once, see load.
+    """
+    if isinstance(spec, InstrumentSpec):
+        REGISTRY[spec.name] = spec
+    else:
+        REGISTRY.update(load(spec))
+
+
+def get(name):
+    """
+    Return the specifications of a registered instrument.
+
+    Parameters:
+        name (str): the name of the instrument.
+    """
+    global _loaded
+    spec = REGISTRY.get(name)
+    if spec is None and not _loaded:
+        _loaded = True
+        for default_name, default in load(SPECIFICATIONS).items():
+            REGISTRY.setdefault(default_name, default)
+        spec = REGISTRY.get(name)
+    if spec is None:
+        raise KeyError("Unknown instrument " + repr(name) + ".")
+    return spec
+
+
+if __name__ == "__main__":
+    print("Hi, this is the Instruments library.\n\
+           It compiles the specifications of the instruments, loaded from\
+           a declarative file, into lookup tables.")
@@ -0,0 +1,185 @@
+"""The required libraries."""
+import functools
+import math
+import os
+import numpy as np
+
+
+# Whether the compiled kernels may be used. They are opt-in, because
+# importing Numba and compiling a kernel take most of a second: set
+# ENABLED to True, or the environment variable LAB_PACKAGES_NUMBA to 1,
+# to use them.
+ENABLED = os.environ.get("LAB_PACKAGES_NUMBA", "") == "1"
+
+# The smallest number of elements worth a compiled kernel. Smaller arrays
+# always use NumPy, without importing Numba.
+MIN_SIZE = 100000
+
+_numba = None
+
+
+def available(size=None):
+    """
+    Check whether the compiled kernels can be used.
+
+    Numba is imported the first time this function is called with the
+    kernels enabled and a large enough size, so that it slows down neither
+    the import of the library nor the small computations.
+
+    Parameters:
+        size (int, default=None): the number of elements to be processed,
+            compared with MIN_SIZE if given.
+    """
+    global _numba
+    if not ENABLED or (size is not None and size < MIN_SIZE):
+        return False
+    if _numba is None:
+        try:
+            import numba
+            _numba = numba
+        except ImportError:
+            _numba = False
+    return bool(_numba)
+
+
+def jit(function):
+    """
+    Compile a kernel with Numba, the first time it is called.
+
+    Without Numba the kernel is executed by the interpreter: the result is
+    the same, only much slower, so the callers use the kernels only when
+    available() is True and keep their NumPy implementation otherwise.
+    """
+    compiled = None
+
+    @functools.wraps(function)
+    def kernel(*args):
+        nonlocal compiled
+        if compiled is None:
+            compiled = _numba.njit(cache=True, nogil=True,
+                                   error_model="numpy")(function)\
+                if available() else function
+        return compiled(*args)
+
+    kernel.python_function = function
+    return kernel
+
+
+# The codes of the functions supported by unary, with the ufuncs they
+# replace.
+SQRT, EXP, LOG, SIN, COS = range(5)
+UNARY_CODES = {np.sqrt: SQRT, np.exp: EXP, np.log: LOG, np.sin: SIN,
+               np.cos: COS}
+
+
+@jit
+def unary(code, value, uncertainty, result, result_uncertainty):
+    """
+    Apply a function to some data, propagating the uncertainty.
+
+    Every element is computed with the same formula used by the static
+    function of Datum, in one pass over the arrays, so the results are
+    identical to applying the function to every single Datum. The NumPy
+    fallback of DatumArray uses the SIMD exp and log of NumPy instead, so
+    without the kernels (no Numba, ENABLED False or fewer than MIN_SIZE
+    data) the values of exp and log and the uncertainties of exp can
+    differ in the last bits.
+
+    Parameters:
+        code (int): the code of the function, see UNARY_CODES.
+        value, uncertainty (numpy.ndarray): the data, one dimensional.
+        result, result_uncertainty (numpy.ndarray): the arrays receiving
+            the results.
+    """
+    for index in range(value.size):
+        x = value[index]
+        if code == SQRT:
+            y = math.sqrt(x)
+            derivative = 0.5/y
+        elif code == EXP:
+            y = math.exp(x)
+            derivative = y
+        elif code == LOG:
+            y = math.log(x)
+            derivative = 1/x
+        elif code == SIN:
+            y = math.sin(x)
+            derivative = math.cos(x)
+        else:
+            y = math.cos(x)
+            derivative = -math.sin(x)
+        result[index] = y
+        result_uncertainty[index] = abs(derivative)*uncertainty[index]
+
+
+@jit
+def weighted_sums(values, uncertainties):
+    """
+    Return the sums of the weights and of the weighted values of some data.
+
+    The data are added one by one with the formula of WeightedMean.add, so
+    the sums are identical to adding every single Datum in order.
+
+    Parameters:
+        values, uncertainties (numpy.ndarray): the data, one dimensional.
+    """
+    weights = 0.
+    weighted_values = 0.
+    for index in range(values.size):
+        weight = 1/uncertainties[index]**2.
+        weights += weight
+        weighted_values += weight*values[index]
+    return weights, weighted_values
+
+
+@jit
+def range_indices(ranges, values, indices):
+    """
+    Find the range of some values.
+
+    The range of a value is the index of the first upper bound of ranges
+    greater than the value, or len(ranges) if there is none: the same
+    result of bisect.bisect_right and of np.searchsorted(side="right").
+
+    Parameters:
+        ranges (numpy.ndarray): the upper bounds of the ranges, sorted.
+        values (numpy.ndarray): the values, one dimensional.
+        indices (numpy.ndarray): the integer array receiving the indices.
+    """
+    for index in range(values.size):
+        low = 0
+        high = ranges.size
+        while low < high:
+            middle = (low + high)//2
+            if values[index] < ranges[middle]:
+                high = middle
+            else:
+                low = middle + 1
+        indices[index] = low
+
+
+def lookup_ranges(ranges, values):
+    """
+    Find the range of some values, see range_indices.
+
+    Parameters:
+        ranges (array_like): the upper bounds of the ranges, sorted.
+        values (array_like): the values.
+
+    Returns:
+        indices (numpy.ndarray): the index of the range of every value.
+    """
+    ranges = np.asarray(ranges, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    if not available(values.size):
+        return np.searchsorted(ranges, values, side="right")
+
+    indices = np.empty(values.shape, dtype=np.intp)
+    range_indices(ranges, values.ravel(), indices.reshape(-1))
+    return indices
+
+
+if __name__ == "__main__":
+    print("Hi, this is the Kernels library.\n\
+           It compiles the innermost loops with Numba, when it is\
+           installed, and falls back to NumPy otherwise.")
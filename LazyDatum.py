@@ -0,0 +1,282 @@
+"""The required libraries."""
+import numpy as np
+from Datum import Datum
+from DatumArray import DatumArray, UNARY_DERIVATIVES, BINARY_DERIVATIVES
+
+
+class LazyDatum:
+    """
+    A node of a deferred computation.
+
+    Instead of computing the result of every operation at once, the
+    operators and the static functions of Datum applied to a LazyDatum
+    record an expression graph. The graph is evaluated only when the result
+    is requested: every node, shared subexpressions included, is computed
+    exactly once, and the uncertainties are obtained from a single
+    reverse-mode differentiation sweep per output.
+
+    The inputs of the graph, the leaves, are independent: they can be single
+    values or whole columns of data, and the operations are applied element
+    by element with the usual broadcasting rules.
+    """
+
+    __slots__ = ("function", "arguments", "value", "uncertainty")
+
+    def __init__(self, value, uncertainty=0.):
+        """
+        Initialize the class, building an input of the graph.
+
+        Parameters:
+            value (float, array_like): the best estimate of the data.
+            uncertainty (float, array_like, default=0.): the uncertainty of
+                the data.
+        """
+        self.function = None
+        self.arguments = ()
+        self.value = np.asarray(value, dtype=np.float64)
+        self.uncertainty = np.abs(np.asarray(uncertainty, dtype=np.float64))
+
+    @staticmethod
+    def _node(function, *arguments):
+        """Create the node applying function to some arguments."""
+        node = object.__new__(LazyDatum)
+        node.function = function
+        node.arguments = tuple(LazyDatum._as_node(argument)
+                               for argument in arguments)
+        node.value = None
+        node.uncertainty = None
+        return node
+
+    @staticmethod
+    def _as_node(argument):
+        """Convert an argument of an operation to a node of the graph."""
+        if isinstance(argument, LazyDatum):
+            return argument
+
+        if isinstance(argument, (Datum, DatumArray)):
+            return LazyDatum(argument.value, argument.uncertainty)
+
+        # Exact numbers are stored without uncertainty, so that they are
+        # skipped by the differentiation.
+        node = LazyDatum._node(None)
+        node.value = np.asarray(argument, dtype=np.float64)
+        return node
+
+    @staticmethod
+    def _supported(argument):
+        """Check whether argument can take part in an operation."""
+        return isinstance(argument, (LazyDatum, Datum, DatumArray, float,
+                                     int, np.number, np.ndarray))
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """
+        Record a NumPy ufunc in the graph.
+
+        This function is what makes np.sqrt, np.sin, ... and the static
+        functions of Datum work on LazyDatum.
+        """
+        if method != "__call__" or kwargs:
+            return NotImplemented
+
+        if not all(LazyDatum._supported(argument) for argument in inputs):
+            return NotImplemented
+
+        if (len(inputs) == 1 and ufunc in UNARY_DERIVATIVES) or\
+           (len(inputs) == 2 and ufunc in BINARY_DERIVATIVES):
+            return LazyDatum._node(ufunc, *inputs)
+
+        return NotImplemented
+
+    def _binary(self, function, other, reverse=False):
+        """Record a binary operation in the graph."""
+        if not LazyDatum._supported(other):
+            return NotImplemented
+
+        if reverse:
+            return LazyDatum._node(function, other, self)
+        return LazyDatum._node(function, self, other)
+
+    def __add__(self, other):
+        """Addition operator."""
+        return self._binary(np.add, other)
+
+    def __radd__(self, other):
+        """Reversed addition operator."""
+        return self._binary(np.add, other, reverse=True)
+
+    def __sub__(self, other):
+        """Subtraction operator."""
+        return self._binary(np.subtract, other)
+
+    def __rsub__(self, other):
+        """Reversed subtraction operator."""
+        return self._binary(np.subtract, other, reverse=True)
+
+    def __mul__(self, other):
+        """Multiplication operator."""
+        return self._binary(np.multiply, other)
+
+    def __rmul__(self, other):
+        """Reversed multiplication operator."""
+        return self._binary(np.multiply, other, reverse=True)
+
+    def __truediv__(self, other):
+        """Division operator."""
+        return self._binary(np.true_divide, other)
+
+    def __rtruediv__(self, other):
+        """Reversed division operator."""
+        return self._binary(np.true_divide, other, reverse=True)
+
+    def __pow__(self, other):
+        """Power operator."""
+        return self._binary(np.power, other)
+
+    def __rpow__(self, other):
+        """Reversed power operator."""
+        return self._binary(np.power, other, reverse=True)
+
+    def __neg__(self):
+        """Negation operator."""
+        return LazyDatum._node(np.negative, self)
+
+    def __repr__(self):
+        """
+        Represent the node.
+
+        This function creates a string representing the object.
+        """
+        if self.function is None:
+            return "LazyDatum(" + repr(self.value) + ", "\
+                + repr(self.uncertainty) + ")"
+        return "LazyDatum(" + self.function.__name__ + ", "\
+            + str(len(self.arguments)) + " arguments)"
+
+    @staticmethod
+    def _sort(outputs):
+        """
+        Sort the nodes needed by some outputs.
+
+        Every node appears once, after all its arguments, so that shared
+        subexpressions are computed only once. The graph is visited without
+        recursion, so arbitrarily deep graphs are supported.
+        """
+        order = []
+        visited = set()
+        stack = [(output, False) for output in outputs]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                order.append(node)
+                continue
+            if id(node) in visited:
+                continue
+            visited.add(id(node))
+            stack.append((node, True))
+            stack.extend((argument, False) for argument in node.arguments
+                         if id(argument) not in visited)
+        return order
+
+    @staticmethod
+    def evaluate_all(outputs):
+        """
+        Evaluate some nodes of the graph together.
+
+        The values are computed in a single forward pass over the nodes
+        shared by all the outputs, then the uncertainty of each output is
+        computed with one reverse-mode sweep.
+
+        Parameters:
+            outputs ([LazyDatum]): the nodes to be evaluated.
+
+        Returns:
+            results ([Datum, DatumArray]): the value of every output, as a
+                Datum for single values and as a DatumArray for arrays.
+        """
+        outputs = list(outputs)
+        order = LazyDatum._sort(outputs)
+
+        # Forward pass: the value of every node, and whether it depends on
+        # some uncertain input at all.
+        values = {}
+        uncertain = {}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for node in order:
+                key = id(node)
+                if node.function is None:
+                    values[key] = node.value
+                    uncertain[key] = node.uncertainty is not None and\
+                        bool(np.any(node.uncertainty))
+                    continue
+                arguments = [id(argument) for argument in node.arguments]
+                values[key] = node.function(*[values[argument]
+                                              for argument in arguments])
+                uncertain[key] = any(uncertain[argument]
+                                     for argument in arguments)
+
+            partials = {}
+            results = []
+            for output in outputs:
+                results.append(LazyDatum._reverse(output, order, values,
+                                                  uncertain, partials))
+
+        return results
+
+    @staticmethod
+    def _reverse(output, order, values, uncertain, partials):
+        """
+        Compute the uncertainty of an output with a reverse-mode sweep.
+
+        The partial derivatives of every node are cached in partials, so
+        that they are shared between the sweeps of different outputs.
+        """
+        value = values[id(output)]
+        adjoints = {id(output): np.ones_like(value)}
+        variance = np.zeros_like(value)
+        for node in reversed(order):
+            key = id(node)
+            adjoint = adjoints.pop(key, None)
+            if adjoint is None:
+                continue
+            if node.function is None:
+                variance = variance + (adjoint*node.uncertainty)**2
+                continue
+            node_partials = partials.get(key)
+            if node_partials is None:
+                node_partials = LazyDatum._partials(node, values)
+                partials[key] = node_partials
+            for argument, partial in zip(node.arguments, node_partials):
+                argument = id(argument)
+                if uncertain[argument]:
+                    adjoints[argument] = adjoints.get(argument, 0.)\
+                        + adjoint*partial
+
+        if np.ndim(value) == 0:
+            return Datum(float(value), float(np.sqrt(variance)))
+        return DatumArray(value, np.sqrt(variance))
+
+    @staticmethod
+    def _partials(node, values):
+        """Return the partial derivatives of a node in its arguments."""
+        arguments = [values[id(argument)] for argument in node.arguments]
+        result = values[id(node)]
+        if len(arguments) == 1:
+            return (UNARY_DERIVATIVES[node.function](*arguments, result),)
+        return tuple(derivative(*arguments, result) for derivative
+                     in BINARY_DERIVATIVES[node.function])
+
+    def evaluate(self):
+        """
+        Evaluate the node.
+
+        Returns:
+            result (Datum, DatumArray): the value of the node with its
+                propagated uncertainty.
+        """
+        return LazyDatum.evaluate_all([self])[0]
+
+
+if __name__ == "__main__":
+    print("Hi, this is the lazy version of the Datum class.\n\
+           It records the operations in a graph and evaluates them all\
+           together, computing the uncertainties in reverse mode.")
@@ -0,0 +1,280 @@
+"""The required libraries."""
+import Instruments
+
+
+# Agilent U1731A
+def agilentU1731A_resistance(R, freq=1e3, masked: bool = False):
+    """
+    Return the resistances measured whith the Agilent RLC bridge.
+
+    Parameters:
+        R (array_like): the values of the resistances.
+        freq (float): the frequency at which were taken the measures.
+        masked (bool, default=False): whether the invalid readings are
+            flagged instead of raising a ValueError.
+
+    Returns:
+        R (DatumArray): the resistances with their uncertainties.
+        valid, reasons (numpy.ndarray): only if masked, the mask of the
+            valid readings and their reason codes, see Instruments.REASONS.
+    """
+    return Instruments.get("agilentU1731A_resistance").measure_array(
+        R, freq, masked)
+
+
+def agilentU1731A_capacitance(C, freq=1e3, masked: bool = False):
+    """
+    Return the capacitances measured whith the Agilent RLC bridge.
+
+    Parameters:
+        C (array_like): the values of the capacitances.
+        freq (float): the frequency at which were taken the measures.
+        masked (bool, default=False): whether the invalid readings are
+            flagged instead of raising a ValueError.
+
+    Returns:
+        C (DatumArray): the capacitances with their uncertainties.
+        valid, reasons (numpy.ndarray): only if masked, the mask of the
+            valid readings and their reason codes, see Instruments.REASONS.
+    """
+    return Instruments.get("agilentU1731A_capacitance").measure_array(
+        C, freq, masked)
+
+
+def agilentU1731A_inductance(L, freq=1e3, masked: bool = False):
+    """
+    Return the inductances measured whith the Agilent RLC bridge.
+
+    Parameters:
+        L (array_like): the values of the inductances.
+        freq (float): the frequency at which were taken the measures.
+        masked (bool, default=False): whether the invalid readings are
+            flagged instead of raising a ValueError.
+
+    Returns:
+        L (DatumArray): the inductances with their uncertainties.
+        valid, reasons (numpy.ndarray): only if masked, the mask of the
+            valid readings and their reason codes, see Instruments.REASONS.
+    """
+    return Instruments.get("agilentU1731A_inductance").measure_array(
+        L, freq, masked)
+
+
+# Keysight U1733C
+def keysightU1733C_resistance(R, freq=1e3, masked: bool = False):
+    """
+    Return the resistances measured whith the Keysight RLC bridge.
+
+    Parameters:
+        R (array_like): the values of the resistances.
+        freq (float): the frequency at which were taken the measures.
+        masked (bool, default=False): whether the invalid readings are
+            flagged instead of raising a ValueError.
+
+    Returns:
+        R (DatumArray): the resistances with their uncertainties.
+        valid, reasons (numpy.ndarray): only if masked, the mask of the
+            valid readings and their reason codes, see Instruments.REASONS.
+    """
+    return Instruments.get("keysightU1733C_resistance").measure_array(
+        R, freq, masked)
+
+
+def keysightU1733C_capacitance(C, freq=1e3, masked: bool = False):
+    """
+    Return the capacitances measured whith the Keysight RLC bridge.
+
+    Parameters:
+        C (array_like): the values of the capacitances.
+        freq (float): the frequency at which were taken the measures.
+        masked (bool, default=False): whether the invalid readings are
+            flagged instead of raising a ValueError.
+
+    Returns:
+        C (DatumArray): the capacitances with their uncertainties.
+        valid, reasons (numpy.ndarray): only if masked, the mask of the
+            valid readings and their reason codes, see Instruments.REASONS.
+    """
+    return Instruments.get("keysightU1733C_capacitance").measure_array(
+        C, freq, masked)
+
+
+def keysightU1733C_inductance(L, freq=1e3, masked: bool = False):
+    """
+    Return the inductances measured whith the Keysight RLC bridge.
+
+    Parameters:
+        L (array_like): the values of the inductances.
+        freq (float): the frequency at which were taken the measures.
+        masked (bool, default=False): whether the invalid readings are
+            flagged instead of raising a ValueError.
+
+    Returns:
+        L (DatumArray): the inductances with their uncertainties.
+        valid, reasons (numpy.ndarray): only if masked, the mask of the
+            valid readings and their reason codes, see Instruments.REASONS.
+    """
+    return Instruments.get("keysightU1733C_inductance").measure_array(
+        L, freq, masked)
+
+
+# Amprobe 37XR-A
+def amprobe37XRA_DCvoltage(V, masked: bool = False):
+    """
+    Return the DC voltages measured whith the Amprobe multimetre.
+
+    Parameters:
+        V (array_like): the values of the DC voltages.
+        masked (bool, default=False): whether the invalid readings are
+            flagged instead of raising a ValueError.
+
+    Returns:
+        V (DatumArray): the voltages with their uncertainties.
+        valid, reasons (numpy.ndarray): only if masked, the mask of the
+            valid readings and their reason codes, see Instruments.REASONS.
+    """
+    return Instruments.get("amprobe37XRA_DCvoltage").measure_array(
+        V, masked=masked)
+
+
+def amprobe37XRA_DCcurrent(J, masked: bool = False):
+    """
+    Return the DC currents measured whith the Amprobe multimetre.
+
+    Parameters:
+        J (array_like): the values of the DC currents.
+        masked (bool, default=False): whether the invalid readings are
+            flagged instead of raising a ValueError.
+
+    Returns:
+        J (DatumArray): the currents with their uncertainties.
+        valid, reasons (numpy.ndarray): only if masked, the mask of the
+            valid readings and their reason codes, see Instruments.REASONS.
+    """
+    return Instruments.get("amprobe37XRA_DCcurrent").measure_array(
+        J, masked=masked)
+
+
+def amprobe37XRA_ACvoltage(V, freq, masked: bool = False):
+    """
+    Return the AC voltages measured whith the Amprobe multimetre.
+
+    Parameters:
+        V (array_like): the values of the AC voltages.
+        freq (array_like): the frequencies of the voltages. It is broadcast
+            against V.
+        masked (bool, default=False): whether the invalid readings are
+            flagged instead of raising a ValueError.
+
+    Returns:
+        V (DatumArray): the voltages with their uncertainties.
+        valid, reasons (numpy.ndarray): only if masked, the mask of the
+            valid readings and their reason codes, see Instruments.REASONS.
+    """
+    return Instruments.get("amprobe37XRA_ACvoltage").measure_array(
+        V, freq, masked)
+
+
+def amprobe37XRA_ACcurrent(J, masked: bool = False):
+    """
+    Return the AC currents measured whith the Amprobe multimetre.
+
+    Parameters:
+        J (array_like): the values of the AC currents.
+        masked (bool, default=False): whether the invalid readings are
+            flagged instead of raising a ValueError.
+
+    Returns:
+        J (DatumArray): the currents with their uncertainties.
+        valid, reasons (numpy.ndarray): only if masked, the mask of the
+            valid readings and their reason codes, see Instruments.REASONS.
+    """
+    return Instruments.get("amprobe37XRA_ACcurrent").measure_array(
+        J, masked=masked)
+
+
+# SuperTester 680 R
+def supertester680R_DCvoltage(V, x2sens=False, masked: bool = False):
+    """
+    Return the DC voltages measured whith the SuperTester.
+
+    Parameters:
+        V (array_like): the values of the DC voltages.
+        x2sens (bool, default=False): whether the 2x sesisbility butto
+            was pressed down.
+        masked (bool, default=False): whether the invalid readings are
+            flagged instead of raising a ValueError.
+
+    Returns:
+        V (DatumArray): the voltages with their uncertainties.
+        valid, reasons (numpy.ndarray): only if masked, the mask of the
+            valid readings and their reason codes, see Instruments.REASONS.
+    """
+    return Instruments.get("supertester680R_DCvoltage").measure_array(
+        V, masked=masked, x2sens=x2sens)
+
+
+def supertester680R_ACvoltage(V, x2sens=False, masked: bool = False):
+    """
+    Return the AC voltages measured whith the SuperTester.
+
+    Parameters:
+        V (array_like): the values of the AC voltages.
+        x2sens (bool, default=False): whether the 2x sesisbility butto
+            was pressed down.
+        masked (bool, default=False): whether the invalid readings are
+            flagged instead of raising a ValueError.
+
+    Returns:
+        V (DatumArray): the voltages with their uncertainties.
+        valid, reasons (numpy.ndarray): only if masked, the mask of the
+            valid readings and their reason codes, see Instruments.REASONS.
+    """
+    return Instruments.get("supertester680R_ACvoltage").measure_array(
+        V, masked=masked, x2sens=x2sens)
+
+
+def supertester680R_DCcurrent(J, x2sens=False, masked: bool = False):
+    """
+    Return the DC currents measured whith the SuperTester.
+
+    Parameters:
+        J (array_like): the values of the DC currents.
+        x2sens (bool, default=False): whether the 2x sesisbility butto
+            was pressed down.
+        masked (bool, default=False): whether the invalid readings are
+            flagged instead of raising a ValueError.
+
+    Returns:
+        J (DatumArray): the currents with their uncertainties.
+        valid, reasons (numpy.ndarray): only if masked, the mask of the
+            valid readings and their reason codes, see Instruments.REASONS.
+    """
+    return Instruments.get("supertester680R_DCcurrent").measure_array(
+        J, masked=masked, x2sens=x2sens)
+
+
+def supertester680R_ACcurrent(J, x2sens=False, masked: bool = False):
+    """
+    Return the AC currents measured whith the SuperTester.
+
+    Parameters:
+        J (array_like): the values of the AC currents.
+        x2sens (bool, default=False): whether the 2x sesisbility butto
+            was pressed down.
+        masked (bool, default=False): whether the invalid readings are
+            flagged instead of raising a ValueError.
+
+    Returns:
+        J (DatumArray): the currents with their uncertainties.
+        valid, reasons (numpy.ndarray): only if masked, the mask of the
+            valid readings and their reason codes, see Instruments.REASONS.
+    """
+    return Instruments.get("supertester680R_ACcurrent").measure_array(
+        J, masked=masked, x2sens=x2sens)
+
+
+if __name__ == "__main__":
+    print("Hi, this is the array version of the MeasureMeans library.\n\
+           It computes the uncertainties of whole columns of readings at\
+           once, finding the range of every reading with a binary search.")
@@ -0,0 +1,226 @@
+"""The required libraries."""
+import math
+import warnings
+import numpy as np
+from Datum import Datum
+
+
+class _Statistics:
+    """
+    The running statistics of the simulated results.
+
+    The state has a bounded size: the number of results, their mean, the
+    sum of the squared deviations from the mean and a histogram used for the
+    percentiles. The edges of the histogram are quantiles of a pilot sample,
+    so every bin holds about the same number of results even for heavy
+    tailed distributions, and the few results outside the edges are kept
+    exactly, so the tails are not clipped. Two states can be merged, so
+    chunks can be processed in any order and by different processes.
+    """
+
+    def __init__(self, edges):
+        """
+        Initialize the class.
+
+        Parameters:
+            edges (numpy.ndarray): the edges of the bins of the histogram.
+        """
+        self.count = 0
+        self.mean = 0.
+        self.squares = 0.
+        self.rejected = 0
+        self.edges = edges
+        # The first and the last bins count the results outside the edges,
+        # which are also kept in outliers.
+        self.histogram = np.zeros(len(edges) + 1, dtype=np.int64)
+        self.outliers = np.empty(0)
+
+    def add(self, results):
+        """Add a chunk of results to the statistics."""
+        finite = np.isfinite(results)
+        if not finite.all():
+            self.rejected += int(results.size - finite.sum())
+            results = results[finite]
+        if results.size == 0:
+            return
+
+        chunk = _Statistics(self.edges)
+        chunk.count = results.size
+        chunk.mean = float(results.mean())
+        chunk.squares = float(((results - chunk.mean)**2).sum())
+        # The bins include their left edge, the last one also its right edge,
+        # so only the results strictly outside the edges are outliers.
+        bins = np.searchsorted(self.edges, results, side="right")
+        bins[results == self.edges[-1]] = len(self.edges) - 1
+        chunk.histogram = np.bincount(bins, minlength=len(self.edges) + 1)
+        chunk.outliers = results[(bins == 0) | (bins == len(self.edges))]
+        self.merge(chunk)
+
+    def merge(self, other):
+        """Merge the statistics of other into these ones."""
+        count = self.count + other.count
+        if other.count:
+            delta = other.mean - self.mean
+            self.mean += delta*other.count/count
+            self.squares += other.squares\
+                + delta**2*self.count*other.count/count
+        self.count = count
+        self.rejected += other.rejected
+        self.histogram += other.histogram
+        self.outliers = np.concatenate((self.outliers, other.outliers))
+
+    def percentiles(self, percentiles):
+        """
+        Return some percentiles of the results.
+
+        The percentiles are interpolated linearly inside the bins of the
+        histogram, so their resolution is about one bin of the pilot
+        quantiles; outside the edges they are interpolated between the
+        outliers, which are exact.
+        """
+        outliers = np.sort(self.outliers)
+        below = outliers[:self.histogram[0]]
+        above = outliers[self.histogram[0]:]
+        cumulative = np.cumsum(self.histogram[1:-1]) + self.histogram[0]
+        cumulative = np.concatenate((
+            np.arange(below.size), [self.histogram[0]], cumulative,
+            np.arange(self.count - above.size + 1, self.count + 1)))
+        values = np.concatenate((below, self.edges, above))
+        targets = np.asarray(percentiles, dtype=np.float64)/100.*self.count
+        return np.interp(targets, cumulative, values)
+
+
+def _sample(means, factor, size, generator):
+    """
+    Draw a chunk of inputs.
+
+    Parameters:
+        means (numpy.ndarray): the means of the inputs.
+        factor (numpy.ndarray): a matrix whose product with its transpose is
+            the covariance matrix of the inputs.
+        size (int): the number of draws.
+        generator (numpy.random.Generator): the random number generator.
+    """
+    return means[:, None] + factor @ generator.standard_normal(
+        (len(means), size))
+
+
+def _run_chunks(function, means, factor, sizes, seeds, edges):
+    """
+    Simulate some chunks and return their statistics.
+
+    This function is executed by the worker processes, so it must be
+    defined at module level.
+    """
+    statistics = _Statistics(edges)
+    for size, seed in zip(sizes, seeds):
+        samples = _sample(means, factor, size, np.random.default_rng(seed))
+        statistics.add(np.asarray(function(*samples), dtype=np.float64))
+    return statistics
+
+
+def monte_carlo(function, inputs, draws=1000000, covariance=None,
+                chunk_size=100000, percentiles=None, processes=None,
+                bins=8192, seed=None):
+    """
+    Propagate the uncertainty with a Monte Carlo simulation.
+
+    This function draws the inputs from normal distributions, evaluates the
+    function on every draw and returns the mean and the standard deviation
+    of the results. Unlike the linear propagation done by Datum, the result
+    is correct also for strongly non linear functions.
+    The draws are processed in chunks, so the memory used is bounded by
+    chunk_size whatever the number of draws.
+
+    Parameters:
+        function (callable): the function to be evaluated. It takes one
+            NumPy array per input and returns an array of results. It must
+            be picklable (e.g. defined at module level) if processes is
+            given.
+        inputs ([Datum]): the inputs of the function. Numbers are exact.
+        draws (int, default=1000000): the number of draws.
+        covariance (array_like, default=None): the covariance matrix of the
+            inputs. If not given the inputs are independent.
+        chunk_size (int, default=100000): the number of draws evaluated in
+            one batch.
+        percentiles (array_like, default=None): if given, the percentiles
+            of the results to be returned too, e.g. (2.5, 50, 97.5).
+        processes (int, default=None): if given, the number of worker
+            processes sharing the chunks.
+        bins (int, default=8192): the number of bins of the histogram used
+            for the percentiles. Their edges are quantiles of the first
+            chunk of results.
+        seed (int, default=None): the seed of the random numbers. The
+            result does not depend on the number of processes.
+
+    Returns:
+        result (Datum): the mean and the standard deviation of the results.
+        percentiles (numpy.ndarray, optional): the requested percentiles.
+    """
+    if draws < 1:
+        raise ValueError("The number of draws must be at least 1.")
+
+    means = np.array([datum.value if isinstance(datum, Datum) else datum
+                      for datum in inputs], dtype=np.float64)
+    if covariance is None:
+        factor = np.diag([datum.uncertainty if isinstance(datum, Datum)
+                          else 0. for datum in inputs])
+    else:
+        covariance = np.asarray(covariance, dtype=np.float64)
+        if covariance.shape != (len(means), len(means)):
+            raise ValueError("Invalid shape of the covariance matrix.")
+        # The square root of the covariance matrix is computed from its
+        # eigendecomposition, which also allows singular matrices.
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        if eigenvalues.min() < -1e-12*max(eigenvalues.max(), 0.):
+            raise ValueError("The covariance matrix is not positive.")
+        factor = eigenvectors*np.sqrt(np.clip(eigenvalues, 0., None))
+
+    sizes = [chunk_size]*(draws//chunk_size)
+    if draws % chunk_size:
+        sizes.append(draws % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    # The quantiles of the first chunk are the edges of the histogram.
+    pilot = np.asarray(function(*_sample(means, factor, sizes[0],
+                                         np.random.default_rng(seeds[0]))),
+                       dtype=np.float64)
+    finite = pilot[np.isfinite(pilot)]
+    edges = np.unique(np.quantile(finite, np.linspace(0., 1., bins + 1)))\
+        if finite.size else np.zeros(1)
+    if edges.size == 1:
+        edges = np.repeat(edges, 2)
+
+    statistics = _Statistics(edges)
+    statistics.add(pilot)
+    if processes is None:
+        statistics.merge(_run_chunks(function, means, factor, sizes[1:],
+                                     seeds[1:], edges))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            tasks = [executor.submit(_run_chunks, function, means, factor,
+                                     sizes[1 + start::processes],
+                                     seeds[1 + start::processes], edges)
+                     for start in range(processes)]
+            for task in tasks:
+                statistics.merge(task.result())
+
+    if statistics.rejected:
+        warnings.warn(str(statistics.rejected) + " results were not finite "
+                      "and were excluded.", RuntimeWarning)
+    if statistics.count < 2:
+        raise ValueError("Not enough finite results.")
+
+    result = Datum(statistics.mean,
+                   math.sqrt(statistics.squares/(statistics.count - 1)))
+    if percentiles is None:
+        return result
+    return result, statistics.percentiles(percentiles)
+
+
+if __name__ == "__main__":
+    print("Hi, this is the Monte Carlo library.\n\
+           It propagates the uncertainty through any function drawing\
+           the inputs at random, in chunks and optionally in parallel.")
@@ -0,0 +1,220 @@
+"""The required libraries."""
+import functools
+import math
+import numbers
+import numpy as np
+
+
+class PValueTable:
+    """
+    An interpolation table of the p-values of a test.
+
+    The table stores the logarithm of the p-value on a uniform grid of a
+    transformed statistic, in which the logarithm is smooth, and returns the
+    p-values by linear interpolation: a scalar lookup costs a few arithmetic
+    operations instead of a call to the machinery of scipy.stats.
+    The grid is refined when the table is built until the relative error,
+    checked against the exact p-value in the middle of every interval where
+    the error of the linear interpolation is largest, is below half the
+    tolerance. Statistics beyond the end of the table, whose p-values are
+    smaller than smallest, are computed exactly.
+
+    The supported tests are:
+        "normal": the two-sided p-value of a normal variable;
+        "student": the two-sided p-value of a student variable;
+        "chi2": the p-value of a chi squared, i.e. its survival function.
+    """
+
+    def __init__(self, test, dof=None, tolerance=1e-6, smallest=1e-300):
+        """
+        Initialize the class, building the table.
+
+        Parameters:
+            test (str): the test, "normal", "student" or "chi2".
+            dof (float, default=None): the degrees of freedom, required by
+                the student and the chi squared tests.
+            tolerance (float, default=1e-6): the maximum relative error of
+                the p-values.
+            smallest (float, default=1e-300): the smallest p-value stored in
+                the table.
+        """
+        if test not in ("normal", "student", "chi2"):
+            raise ValueError("Unknown test " + repr(test) + ".")
+        if test != "normal" and not dof > 0:
+            raise ValueError("The degrees of freedom must be positive.")
+
+        self.test = test
+        self.dof = dof
+        self.tolerance = tolerance
+        # The chi squared is tabulated as a power of the statistic chosen
+        # so that the p-value is smooth also near zero.
+        self._power = min(dof, 1)/2 if test == "chi2" else None
+
+        # The end of the table, where the p-value reaches smallest or where
+        # the exact p-value underflows, as the student one does for large
+        # statistics.
+        low, high = 0., 1.
+        while self._exact_log(high) > math.log(smallest):
+            low, high = high, 2*high
+        for _ in range(60):
+            middle = (low + high)/2
+            if self._exact_log(middle) > math.log(smallest):
+                low = middle
+            else:
+                high = middle
+        self.end = low
+
+        intervals = 256
+        while True:
+            grid = np.linspace(0., self.end, intervals + 1)
+            table = self._exact_log(grid)
+            middle = (grid[1:] + grid[:-1])/2
+            error = np.expm1((table[1:] + table[:-1])/2
+                             - self._exact_log(middle))
+            if np.max(np.abs(error)) <= tolerance/2:
+                break
+            if intervals >= 1 << 22:
+                raise ValueError("The tolerance cannot be reached.")
+            intervals *= 2
+
+        self.step = self.end/intervals
+        self._intervals = intervals
+        self.table = table
+        self._slopes = np.diff(table)
+        # A list is faster than an array for the scalar lookups.
+        self._list = table.tolist()
+
+    def _transform(self, statistic):
+        """Return the coordinate of the table for some statistics."""
+        if self.test == "normal":
+            return np.abs(statistic)
+        if self.test == "student":
+            return np.log1p(np.abs(statistic))
+        return np.power(np.maximum(statistic, 0.), self._power)
+
+    def _exact_log(self, coordinate):
+        """Return the logarithm of the exact p-value at some coordinates."""
+        from scipy import special
+
+        with np.errstate(divide="ignore"):
+            if self.test == "normal":
+                return special.log_ndtr(-np.asarray(coordinate)) + math.log(2)
+            if self.test == "student":
+                return np.log(2*special.stdtr(self.dof,
+                                              -np.expm1(coordinate)))
+            return np.log(special.chdtrc(self.dof, np.power(
+                coordinate, 1/self._power)))
+
+    def exact(self, statistic):
+        """
+        Return the exact p-values of some statistics.
+
+        Parameters:
+            statistic (float, array_like): the statistics.
+        """
+        result = np.exp(self._exact_log(self._transform(statistic)))
+        if np.ndim(result) == 0:
+            return float(result)
+        return result
+
+    def __call__(self, statistic):
+        """
+        Return the p-values of some statistics.
+
+        Parameters:
+            statistic (float, array_like): the statistics. The scalars are
+                looked up without NumPy.
+
+        Returns:
+            pVal (float, numpy.ndarray): the p-values.
+        """
+        if isinstance(statistic, numbers.Real):
+            if self.test == "normal":
+                coordinate = abs(statistic)
+            elif self.test == "student":
+                coordinate = math.log1p(abs(statistic))
+            else:
+                coordinate = max(statistic, 0.)**self._power
+            position = coordinate/self.step
+            # The comparison is also False for NaN.
+            if not position < self._intervals:
+                return self.exact(statistic)
+            index = int(position)
+            start = self._list[index]
+            return math.exp(start + (position - index)
+                            * (self._list[index + 1] - start))
+
+        statistic = np.asarray(statistic, dtype=np.float64)
+        position = self._transform(statistic)/self.step
+        inside = position < self._intervals
+        # The grid is uniform, so the interval is found without searching.
+        position = np.where(inside, position, 0.)
+        index = position.astype(np.intp)
+        result = np.exp(self.table[index]
+                        + (position - index)*self._slopes[index])
+        if not inside.all():
+            result[~inside] = self.exact(statistic[~inside])
+        return result
+
+    def __repr__(self):
+        """
+        Represent the table.
+
+        This function creates a string representing the object.
+        """
+        return "PValueTable(" + repr(self.test) + ", dof=" + repr(self.dof)\
+            + ", tolerance=" + repr(self.tolerance) + ", "\
+            + str(len(self.table)) + " points)"
+
+
+@functools.lru_cache(maxsize=64)
+def table(test, dof=None, tolerance=1e-6):
+    """
+    Return the table of a test, building it only the first time.
+
+    The tables are cached by test, degrees of freedom and tolerance, so
+    loops testing with a few different degrees of freedom build each table
+    once.
+    """
+    return PValueTable(test, dof, tolerance)
+
+
+def normal_pvalue(Z, tolerance=1e-6):
+    """
+    Return the two-sided p-values of some normal variables.
+
+    Parameters:
+        Z (float, array_like): the normal variables.
+        tolerance (float, default=1e-6): the maximum relative error.
+    """
+    return table("normal", None, tolerance)(Z)
+
+
+def student_pvalue(tVal, dof, tolerance=1e-6):
+    """
+    Return the two-sided p-values of some student variables.
+
+    Parameters:
+        tVal (float, array_like): the student variables.
+        dof (float): the degrees of freedom.
+        tolerance (float, default=1e-6): the maximum relative error.
+    """
+    return table("student", float(dof), tolerance)(tVal)
+
+
+def chi2_pvalue(chi_2, dof, tolerance=1e-6):
+    """
+    Return the p-values of some chi squared.
+
+    Parameters:
+        chi_2 (float, array_like): the chi squared.
+        dof (float): the degrees of freedom.
+        tolerance (float, default=1e-6): the maximum relative error.
+    """
+    return table("chi2", float(dof), tolerance)(chi_2)
+
+
+if __name__ == "__main__":
+    print("Hi, this is the PValues library.\n\
+           It returns p-values from precomputed interpolation tables, with\
+           a guaranteed relative error.")
@@ -0,0 +1,373 @@
+"""The required libraries."""
+import numbers
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import (ExtensionArray, ExtensionDtype,
+                                   register_extension_dtype, take)
+from pandas.api.indexers import check_array_indexer
+from Datum import Datum
+from DatumArray import DatumArray
+
+
+@register_extension_dtype
+class DatumDtype(ExtensionDtype):
+    """
+    The pandas dtype of the columns of data.
+
+    It can be requested by name, e.g. pd.Series(data, dtype="datum").
+    """
+
+    name = "datum"
+    type = Datum
+    kind = "O"
+    na_value = np.nan
+    _is_numeric = True
+
+    @classmethod
+    def construct_array_type(cls):
+        """Return the array type associated with this dtype."""
+        return DatumExtensionArray
+
+
+class DatumExtensionArray(ExtensionArray):
+    """
+    A pandas column of data.
+
+    The data are stored as two float64 arrays, the values and the
+    uncertainties, instead of one Datum object per cell, and the operations
+    are delegated to DatumArray, so they propagate the uncertainty of the
+    whole column at once. Missing data have a NaN value.
+    """
+
+    def __init__(self, value, uncertainty=0., copy=False):
+        """
+        Initialize the class.
+
+        Parameters:
+            value (array_like): the best estimates of the data.
+            uncertainty (array_like, default=0.): the uncertainties of the
+                data. It is broadcast against value.
+            copy (bool, default=False): whether the arrays must be copied.
+        """
+        value = np.array(value, dtype=np.float64, copy=copy or None,
+                         ndmin=1)
+        uncertainty = np.abs(np.asarray(uncertainty, dtype=np.float64))
+        if value.ndim != 1:
+            raise ValueError("The data must be one dimensional.")
+        self.value = value
+        self.uncertainty = np.array(np.broadcast_to(uncertainty, value.shape))
+
+    @classmethod
+    def _new(cls, value, uncertainty):
+        """Create an instance from already computed arrays."""
+        array = object.__new__(cls)
+        array.value = value
+        array.uncertainty = uncertainty
+        return array
+
+    @classmethod
+    def _from_sequence(cls, scalars, *, dtype=None, copy=False):
+        """Build an array from a sequence of Datum, numbers or NA."""
+        if isinstance(scalars, DatumExtensionArray):
+            return scalars.copy() if copy else scalars
+        if isinstance(scalars, DatumArray):
+            return cls(scalars.value.ravel(), scalars.uncertainty.ravel(),
+                       copy=copy)
+
+        scalars = list(scalars)
+        value = np.empty(len(scalars))
+        uncertainty = np.zeros(len(scalars))
+        for index, scalar in enumerate(scalars):
+            if isinstance(scalar, Datum):
+                value[index] = scalar.value
+                uncertainty[index] = scalar.uncertainty
+            elif isinstance(scalar, numbers.Real):
+                value[index] = scalar
+            elif pd.isna(scalar):
+                value[index] = np.nan
+            else:
+                raise TypeError("Cannot convert " + repr(scalar)
+                                + " to a datum.")
+        return cls._new(value, uncertainty)
+
+    @classmethod
+    def _from_factorized(cls, values, original):
+        """Rebuild an array from the values returned by factorize."""
+        return cls._new(values.real.copy(), values.imag.copy())
+
+    def _values_for_factorize(self):
+        """Pack every datum in a complex number, so that it is hashable."""
+        return self.value + 1j*self.uncertainty, np.nan + 0j
+
+    def _values_for_argsort(self):
+        """Sort the data by their values."""
+        return self.value
+
+    @classmethod
+    def _concat_same_type(cls, to_concat):
+        """Concatenate some arrays."""
+        return cls._new(np.concatenate([array.value for array in to_concat]),
+                        np.concatenate([array.uncertainty
+                                        for array in to_concat]))
+
+    @property
+    def dtype(self):
+        """The dtype of the array."""
+        return DatumDtype()
+
+    @property
+    def nbytes(self):
+        """The number of bytes used by the array."""
+        return self.value.nbytes + self.uncertainty.nbytes
+
+    def __len__(self):
+        """Return the number of data."""
+        return len(self.value)
+
+    def __getitem__(self, key):
+        """
+        Index the array.
+
+        A single element is returned as a Datum (or NaN if missing),
+        anything else as a DatumExtensionArray.
+        """
+        if isinstance(key, numbers.Integral):
+            value = self.value[key]
+            if np.isnan(value):
+                return self.dtype.na_value
+            return Datum(float(value), float(self.uncertainty[key]))
+
+        key = check_array_indexer(self, key)
+        return DatumExtensionArray._new(self.value[key],
+                                        self.uncertainty[key])
+
+    def __setitem__(self, key, value):
+        """Assign some elements of the array."""
+        key = check_array_indexer(self, key)
+        if isinstance(value, (DatumExtensionArray, DatumArray)):
+            self.value[key] = value.value
+            self.uncertainty[key] = value.uncertainty
+        elif isinstance(value, Datum):
+            self.value[key] = value.value
+            self.uncertainty[key] = value.uncertainty
+        elif pd.api.types.is_scalar(value) and pd.isna(value):
+            self.value[key] = np.nan
+            self.uncertainty[key] = 0.
+        elif pd.api.types.is_list_like(value):
+            value = DatumExtensionArray._from_sequence(value)
+            self.value[key] = value.value
+            self.uncertainty[key] = value.uncertainty
+        else:
+            self.value[key] = value
+            self.uncertainty[key] = 0.
+
+    def isna(self):
+        """Return the mask of the missing data."""
+        return np.isnan(self.value)
+
+    def take(self, indices, allow_fill=False, fill_value=None):
+        """Take some elements of the array, see pandas.api.extensions.take."""
+        if allow_fill and isinstance(fill_value, Datum):
+            fill = fill_value.value, fill_value.uncertainty
+        elif allow_fill and (fill_value is None or pd.isna(fill_value)):
+            fill = np.nan, 0.
+        elif allow_fill:
+            fill = float(fill_value), 0.
+        else:
+            fill = None, None
+        return DatumExtensionArray._new(
+            take(self.value, indices, allow_fill=allow_fill,
+                 fill_value=fill[0]),
+            take(self.uncertainty, indices, allow_fill=allow_fill,
+                 fill_value=fill[1]))
+
+    def copy(self):
+        """Return a copy of the array."""
+        return DatumExtensionArray._new(self.value.copy(),
+                                        self.uncertainty.copy())
+
+    def __array__(self, dtype=None, copy=None):
+        """
+        Convert the array to NumPy.
+
+        The result is an array of Datum, or the array of the values if a
+        numeric dtype is requested.
+        """
+        if dtype is None or np.dtype(dtype) == object:
+            result = np.empty(len(self), dtype=object)
+            result[:] = [self[index] for index in range(len(self))]
+            return result
+        return self.value.astype(dtype)
+
+    def to_datum_array(self):
+        """Return the data as a DatumArray, sharing the memory."""
+        return DatumArray._new(self.value, self.uncertainty)
+
+    def __eq__(self, other):
+        """Equality operator, element by element."""
+        if isinstance(other, (pd.Series, pd.Index, pd.DataFrame)):
+            return NotImplemented
+
+        operand = DatumArray._operand(_unwrap(other))
+        if operand is None:
+            return NotImplemented
+        value, uncertainty = operand
+        return (self.value == value)\
+            & (self.uncertainty == (0. if uncertainty is None
+                                    else uncertainty))
+
+    def _reduce(self, name, *, skipna=True, keepdims=False, **kwargs):
+        """
+        Reduce the array.
+
+        The sum and the mean propagate the uncertainty as DatumArray.sum and
+        DatumArray.mean, min and max compare the values.
+        """
+        data = self.to_datum_array()
+        if skipna:
+            data = data[~self.isna()]
+        if name == "sum":
+            result = data.sum()
+        elif name == "mean":
+            result = data.mean()
+        elif name in ("min", "max") and len(data):
+            index = getattr(np, "arg" + name)(data.value)
+            result = data[int(index)]
+        else:
+            return super()._reduce(name, skipna=skipna, keepdims=keepdims,
+                                   **kwargs)
+
+        if keepdims:
+            return DatumExtensionArray._from_sequence([result])
+        return result
+
+    def _groupby_op(self, *, how, has_dropped_na, min_count, ngroups, ids,
+                    **kwargs):
+        """
+        Reduce every group of a groupby.
+
+        The sum and the mean of the groups are computed for all the groups
+        at once with np.bincount.
+        """
+        if how not in ("sum", "mean"):
+            return super()._groupby_op(how=how, has_dropped_na=has_dropped_na,
+                                       min_count=min_count, ngroups=ngroups,
+                                       ids=ids, **kwargs)
+
+        valid = (ids >= 0) & ~self.isna()
+        ids = ids[valid]
+        value = np.bincount(ids, self.value[valid], minlength=ngroups)
+        variance = np.bincount(ids, self.uncertainty[valid]**2,
+                               minlength=ngroups)
+        if how == "mean":
+            counts = np.bincount(ids, minlength=ngroups)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                value = value/counts
+                variance = variance/counts**2
+        return DatumExtensionArray._new(value, np.sqrt(variance))
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """
+        Apply a NumPy ufunc, propagating the uncertainty as DatumArray.
+
+        Series and DataFrame are left to pandas, which calls this function
+        again on the arrays.
+        """
+        if any(isinstance(argument, (pd.Series, pd.Index, pd.DataFrame))
+               for argument in inputs):
+            return NotImplemented
+
+        result = getattr(ufunc, method)(*[_unwrap(argument)
+                                          for argument in inputs], **kwargs)
+        return _wrap(result)
+
+
+def _unwrap(argument):
+    """Convert a DatumExtensionArray to a DatumArray."""
+    if isinstance(argument, DatumExtensionArray):
+        return argument.to_datum_array()
+    return argument
+
+
+def _wrap(result):
+    """Convert the result of a DatumArray operation to pandas."""
+    if isinstance(result, DatumArray):
+        return DatumExtensionArray._new(result.value, result.uncertainty)
+    return result
+
+
+def _operator(name):
+    """Return an operator of DatumExtensionArray delegating to DatumArray."""
+    def operator(self, other):
+        if isinstance(other, (pd.Series, pd.Index, pd.DataFrame)):
+            return NotImplemented
+
+        result = getattr(self.to_datum_array(), name)(_unwrap(other))
+        if result is NotImplemented:
+            return result
+        return _wrap(result)
+
+    operator.__name__ = name
+    operator.__doc__ = "The " + name.strip("_") + " operator, see DatumArray."
+    return operator
+
+
+for _name in ("__add__", "__radd__", "__sub__", "__rsub__", "__mul__",
+              "__rmul__", "__truediv__", "__rtruediv__", "__lt__", "__gt__"):
+    setattr(DatumExtensionArray, _name, _operator(_name))
+
+
+def weighted_mean(data):
+    """
+    Return the weighted mean of a column of data.
+
+    It can be used with Series.agg and with the agg of a groupby; for many
+    groups, groupby_weighted_mean computes all the means at once.
+
+    Parameters:
+        data (pandas.Series, DatumExtensionArray): the data. Missing data
+            are skipped.
+    """
+    from WeightedMean import WeightedMean
+
+    data = getattr(data, "array", data)
+    valid = ~data.isna()
+    return WeightedMean().add_arrays(data.value[valid],
+                                     data.uncertainty[valid]).result()
+
+
+def groupby_weighted_mean(data, by):
+    """
+    Return the weighted mean of every group of a column of data.
+
+    The means of all the groups are computed at once with np.bincount, so
+    the time does not depend on the number of groups.
+
+    Parameters:
+        data (pandas.Series): the data, with dtype "datum". Missing data are
+            skipped.
+        by (array_like, pandas.Series): the group of every datum.
+
+    Returns:
+        means (pandas.Series): the weighted mean of every group, indexed by
+            the groups in sorted order.
+    """
+    codes, groups = pd.factorize(by, sort=True)
+    array = data.array
+    valid = (codes >= 0) & ~array.isna()
+    codes = codes[valid]
+    weights = array.uncertainty[valid]**-2
+    weight = np.bincount(codes, weights, minlength=len(groups))
+    value = np.bincount(codes, weights*array.value[valid],
+                        minlength=len(groups))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = DatumExtensionArray._new(value/weight, weight**-0.5)
+    return pd.Series(means, index=pd.Index(groups, name=getattr(by, "name",
+                                                                 None)),
+                     name=data.name)
+
+
+if __name__ == "__main__":
+    print("Hi, this is the pandas version of the DatumArray class.\n\
+           It stores columns of data in DataFrames as two float arrays and\
+           propagates their uncertainty at NumPy speed.")
@@ -0,0 +1,149 @@
+"""The required libraries."""
+import functools
+import json
+import time
+from Datum import Datum, CorrelatedDatum
+
+
+class Profiler:
+    """
+    An opt-in profiler of the operations on Datum.
+
+    While the profiler is running, the operators and the static functions of
+    Datum (and of CorrelatedDatum) are replaced by wrappers which count the
+    calls and accumulate the wall time spent in each of them. The original
+    functions are put back when the profiler stops, so a disabled profiler
+    costs nothing at all.
+    The times are inclusive: a static function calling other functions of
+    Datum, like weighted_mean, also counts the time spent in them.
+
+    It can be used as a context manager:
+
+        with Profiler() as profiler:
+            analysis()
+        print(profiler.report())
+    """
+
+    _running = None
+
+    def __init__(self, classes=(Datum, CorrelatedDatum)):
+        """
+        Initialize the class.
+
+        Parameters:
+            classes (tuple, default=(Datum, CorrelatedDatum)): the classes
+                whose operations are profiled.
+        """
+        self.classes = tuple(classes)
+        self.calls = {}
+        self.times = {}
+        self._originals = []
+
+    @staticmethod
+    def _profiled(name):
+        """Check whether the attribute called name has to be profiled."""
+        return not name.startswith("_")\
+            or (name.startswith("__") and name.endswith("__"))
+
+    def _wrap(self, key, function):
+        """Return a wrapper of function recording its calls under key."""
+        calls, times = self.calls, self.times
+        clock = time.perf_counter_ns
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                times[key] = times.get(key, 0) + clock() - start
+                calls[key] = calls.get(key, 0) + 1
+
+        return wrapper
+
+    def start(self):
+        """Start profiling, installing the wrappers."""
+        if Profiler._running is not None:
+            raise RuntimeError("Another profiler is already running.")
+
+        Profiler._running = self
+        for cls in self.classes:
+            for name, attribute in list(vars(cls).items()):
+                if not Profiler._profiled(name):
+                    continue
+                key = cls.__name__ + "." + name
+                if isinstance(attribute, staticmethod):
+                    wrapper = staticmethod(self._wrap(key,
+                                                      attribute.__func__))
+                elif callable(attribute):
+                    wrapper = self._wrap(key, attribute)
+                else:
+                    continue
+                self._originals.append((cls, name, attribute))
+                setattr(cls, name, wrapper)
+        return self
+
+    def stop(self):
+        """Stop profiling, restoring the original functions."""
+        for cls, name, attribute in reversed(self._originals):
+            setattr(cls, name, attribute)
+        self._originals = []
+        if Profiler._running is self:
+            Profiler._running = None
+        return self
+
+    def __enter__(self):
+        """Start profiling when entering the with statement."""
+        return self.start()
+
+    def __exit__(self, *exception):
+        """Stop profiling when leaving the with statement."""
+        self.stop()
+        return False
+
+    def reset(self):
+        """Forget the totals collected so far."""
+        self.calls.clear()
+        self.times.clear()
+
+    def totals(self):
+        """
+        Return the totals collected so far.
+
+        Returns:
+            totals ([(str, int, float)]): the name, the number of calls and
+                the total time in seconds of every operation called at least
+                once, sorted by decreasing total time.
+        """
+        return sorted(((key, self.calls[key], self.times[key]*1e-9)
+                       for key in self.calls),
+                      key=lambda total: total[2], reverse=True)
+
+    def report(self):
+        """Return the totals as a table, sorted by decreasing total time."""
+        totals = self.totals()
+        width = max([len("Operation")] + [len(key) for key, _, _ in totals])
+        lines = ["Operation".ljust(width) + "       Calls    Total (s)"
+                 "  Per call (us)"]
+        for key, calls, seconds in totals:
+            lines.append(key.ljust(width) + " %11d %12.6f %14.3f"
+                         % (calls, seconds, seconds/calls*1e6))
+        return "\n".join(lines)
+
+    def to_json(self, **kwargs):
+        """
+        Return the totals as a JSON string.
+
+        Parameters:
+            kwargs: the keyword arguments of json.dumps, e.g. indent.
+        """
+        return json.dumps([{"operation": key, "calls": calls,
+                            "seconds": seconds}
+                           for key, calls, seconds in self.totals()],
+                          **kwargs)
+
+
+if __name__ == "__main__":
+    print("Hi, this is the Profiler library.\n\
+           It counts the calls and the time spent in every operation on\
+           Datum, only while it is running.")
@@ -0,0 +1,222 @@
+"""The required libraries."""
+import math
+import numbers
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from Datum import Datum
+from DatumArray import DatumArray
+
+
+# The arrays attached by a process, by name, so that a worker attaches
+# every block of shared memory only once however many tasks it runs.
+_attached = {}
+
+
+class SharedDatumArray(DatumArray):
+    """
+    A column of data stored in shared memory.
+
+    The values and the uncertainties are two views of a single block of
+    shared memory. Pickling an instance, e.g. to send it to a worker
+    process, only sends the name of the block and the shape: the worker
+    attaches the same memory, without copying the data.
+    The process which created the array owns the memory and must release it
+    with unlink (or a with statement) when no process needs it any more.
+    """
+
+    def __init__(self, value, uncertainty=0.):
+        """
+        Initialize the class, copying some data to a new block of memory.
+
+        Parameters:
+            value (array_like): the best estimates of the data.
+            uncertainty (array_like, default=0.): the uncertainties of the
+                data. It is broadcast against value.
+        """
+        data = DatumArray(value, uncertainty)
+        self._allocate(data.shape)
+        self.value[...] = data.value
+        self.uncertainty[...] = data.uncertainty
+
+    def _allocate(self, shape, name=None):
+        """Create (or, if name is given, attach) the shared memory."""
+        size = math.prod(shape)
+        if name is None:
+            # Zero bytes of shared memory are not allowed.
+            self.memory = SharedMemory(create=True,
+                                       size=max(2*size*8, 1))
+        else:
+            self.memory = SharedMemory(name=name)
+        self._owner = name is None
+        buffer = np.ndarray((2, size), dtype=np.float64,
+                            buffer=self.memory.buf)
+        self.value = buffer[0].reshape(shape)
+        self.uncertainty = buffer[1].reshape(shape)
+
+    @classmethod
+    def empty(cls, shape):
+        """
+        Create an array of exact zeros in a new block of memory.
+
+        Parameters:
+            shape (tuple): the shape of the array.
+        """
+        array = object.__new__(cls)
+        array._allocate(tuple(shape))
+        array.value[...] = 0.
+        array.uncertainty[...] = 0.
+        return array
+
+    @classmethod
+    def from_array(cls, data):
+        """
+        Copy a DatumArray to a new block of memory.
+
+        Parameters:
+            data (DatumArray): the data.
+        """
+        return cls(data.value, data.uncertainty)
+
+    @staticmethod
+    def _attach(name, shape):
+        """Attach an existing block of memory. Used by pickle."""
+        array = _attached.get(name)
+        if array is None or array.shape != shape:
+            array = object.__new__(SharedDatumArray)
+            array._allocate(shape, name)
+            _attached[name] = array
+        return array
+
+    def __reduce__(self):
+        """Pickle the array as the name of its memory and its shape."""
+        return SharedDatumArray._attach, (self.memory.name, self.shape)
+
+    def close(self):
+        """
+        Detach the memory from this process.
+
+        No view of the array (e.g. the slices returned by indexing) must be
+        alive.
+        """
+        _attached.pop(self.memory.name, None)
+        self.value = self.uncertainty = None
+        self.memory.close()
+
+    def unlink(self):
+        """Detach the memory and release it, if this process owns it."""
+        if self._owner:
+            self.memory.unlink()
+        self.close()
+
+    def __enter__(self):
+        """Return the array, to be released at the end of a with block."""
+        return self
+
+    def __exit__(self, *exception):
+        """Release the memory at the end of a with block."""
+        self.unlink()
+        return False
+
+
+def _sized(column):
+    """Check whether a column is an array, split between the tasks."""
+    return isinstance(column, DatumArray) or (isinstance(column, np.ndarray)
+                                              and column.ndim > 0)
+
+
+def _run_block(function, columns, output, start, stop):
+    """
+    Apply function to a block of rows, writing the results to output.
+
+    This function is executed by the worker processes, so it must be
+    defined at module level.
+    """
+    block = [column[start:stop] if _sized(column) else column
+             for column in columns]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result = function(*block)
+    if isinstance(result, DatumArray):
+        output.value[start:stop] = result.value
+        output.uncertainty[start:stop] = result.uncertainty
+    else:
+        output.value[start:stop] = result
+
+
+def parallel_map(function, columns, processes=None, block_size=None):
+    """
+    Apply a function to some columns of data with a pool of processes.
+
+    The columns are split into blocks of rows, and every worker reads its
+    blocks from shared memory and writes its results to a shared output, so
+    only the names of the blocks of memory and the bounds of the rows are
+    pickled, never the data.
+
+    Parameters:
+        function (callable): the function. It takes one block per column and
+            returns a DatumArray or an array of exact values with one row per
+            row of the block. It must be picklable (e.g. defined at module
+            level).
+        columns (list): the columns. SharedDatumArray are shared without
+            copies, other DatumArray and arrays are copied to shared memory
+            once; Datum and numbers are passed unchanged to every block.
+        processes (int, default=None): the number of worker processes, by
+            default the number of processors.
+        block_size (int, default=None): the number of rows of a block, by
+            default a quarter of the rows of each worker.
+
+    Returns:
+        results (SharedDatumArray): the results. The caller owns their
+            memory and must release it with unlink.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    import os
+
+    processes = processes or os.cpu_count() or 1
+    copies = []
+    shared = []
+    output = None
+    try:
+        for column in columns:
+            if _sized(column) and not isinstance(column, SharedDatumArray):
+                column = SharedDatumArray.from_array(column) if isinstance(
+                    column, DatumArray) else SharedDatumArray(column)
+                copies.append(column)
+            elif not (_sized(column)
+                      or isinstance(column, (Datum, numbers.Number))):
+                raise TypeError("Unsupported column.")
+            shared.append(column)
+
+        lengths = {len(column) for column in shared if _sized(column)}
+        if len(lengths) != 1:
+            raise ValueError("The columns must be arrays of the same length.")
+        length = lengths.pop()
+        block_size = block_size or max(-(-length // (4*processes)), 1)
+
+        # A single row fixes the shape of the results.
+        probe = function(*[column[:1] if _sized(column) else column
+                           for column in shared])
+        probe = probe.value if isinstance(probe, DatumArray)\
+            else np.asarray(probe)
+        output = SharedDatumArray.empty((length,) + probe.shape[1:])
+
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            tasks = [executor.submit(_run_block, function, shared, output,
+                                     start, min(start + block_size, length))
+                     for start in range(0, length, block_size)]
+            for task in tasks:
+                task.result()
+    except BaseException:
+        # The results are released too, as the caller never gets them.
+        if output is not None:
+            output.unlink()
+        raise
+    finally:
+        for column in copies:
+            column.unlink()
+    return output
+
+
+if __name__ == "__main__":
+    print("Hi, this is the shared memory version of the DatumArray class.\n\
+           It lets a pool of processes propagate the uncertainty of the\
+           same columns of data without pickling them.")
@@ -0,0 +1,229 @@
+"""The required libraries."""
+import numpy as np
+from DatumArray import DatumArray
+
+
+def decimals(uncertainty):
+    """
+    Return the number of decimals to be shown for some uncertainties.
+
+    This function applies to whole arrays the rule used by Datum.__repr__:
+    the uncertainty is shown with one significant digit, or with two if the
+    first one is 1. Negative results mean rounding to the left of the
+    decimal point.
+
+    Parameters:
+        uncertainty (array_like): the uncertainties. They must be positive
+            and finite.
+    """
+    uncertainty = np.asarray(uncertainty, dtype=np.float64)
+    magnitude = np.floor(np.log10(uncertainty))
+    first_digit = np.floor_divide(uncertainty, 10.**magnitude)
+    return -np.where(first_digit == 1, magnitude - 1, magnitude).astype(int)
+
+
+def format_data(value, uncertainty):
+    """
+    Format some data with the significant digits of their uncertainty.
+
+    The data are rounded with the rule of Datum.__repr__; unlike it, the
+    trailing zeros are kept so that values and uncertainties always have
+    the same number of decimals. Exact values (and values with a non finite
+    uncertainty) are written with 15 significant digits.
+    The data are formatted in groups with the same number of decimals, so
+    the work is done by NumPy string operations instead of a Python call
+    per datum.
+
+    Parameters:
+        value (array_like): the values of the data.
+        uncertainty (array_like): the uncertainties of the data.
+
+    Returns:
+        values (numpy.ndarray): the formatted values.
+        uncertainties (numpy.ndarray): the formatted uncertainties.
+    """
+    value, uncertainty = np.broadcast_arrays(
+        np.asarray(value, dtype=np.float64),
+        np.asarray(uncertainty, dtype=np.float64))
+    regular = np.isfinite(uncertainty) & (uncertainty > 0.)
+    digits = np.zeros(value.shape, dtype=int)
+    digits[regular] = decimals(uncertainty[regular])
+
+    groups = []
+    if not regular.all():
+        exact = ~regular
+        groups.append((exact, np.char.mod("%.15g", value[exact]),
+                       np.char.mod("%g", uncertainty[exact])))
+    for digit in np.unique(digits[regular]):
+        mask = regular & (digits == digit)
+        style = "%." + str(max(digit, 0)) + "f"
+        groups.append((mask,
+                       np.char.mod(style, np.round(value[mask], digit)),
+                       np.char.mod(style, np.round(uncertainty[mask], digit))))
+
+    width = max([1] + [max(strings.itemsize, uncertainties.itemsize) // 4
+                       for _, strings, uncertainties in groups])
+    values = np.empty(value.shape, dtype="U" + str(width))
+    uncertainties = np.empty(value.shape, dtype="U" + str(width))
+    for mask, strings, uncertainty_strings in groups:
+        values[mask] = strings
+        uncertainties[mask] = uncertainty_strings
+    return values, uncertainties
+
+
+def _columns(columns):
+    """
+    Return the columns of a table as a list of names, values, uncertainties.
+
+    Parameters:
+        columns (dict): the columns, by name. Every column can be a
+            DatumArray or an array of exact values.
+    """
+    table = []
+    for name, column in columns.items():
+        if isinstance(column, DatumArray):
+            table.append((str(name), column.value.ravel(),
+                          column.uncertainty.ravel()))
+        else:
+            column = np.asarray(column, dtype=np.float64).ravel()
+            table.append((str(name), column, np.zeros_like(column)))
+
+    if len({len(value) for _, value, _ in table}) > 1:
+        raise ValueError("The columns have different lengths.")
+    return table
+
+
+def _join(parts):
+    """Concatenate some arrays of strings element by element."""
+    result = parts[0]
+    for part in parts[1:]:
+        result = np.char.add(result, part)
+    return result
+
+
+def _concatenate(strings):
+    """
+    Concatenate an array of strings into a single str.
+
+    The array stores every string as fixed width UCS4 code points, padded
+    with zeros: the padding is dropped with a mask and the code points are
+    decoded at once, without building a str per element.
+    """
+    codes = np.ascontiguousarray(strings).view(np.uint32)
+    return codes[codes != 0].astype("<u4").tobytes().decode("utf-32-le")
+
+
+def _write_rows(file, table, cell, separator, start, end, chunk_size):
+    """
+    Write the rows of a table, one chunk at a time.
+
+    Every chunk of rows is built with NumPy string operations and joined
+    into the text written with a single call, without a str per row, so
+    the memory used is bounded by chunk_size.
+    """
+    rows = len(table[0][1]) if table else 0
+    for begin in range(0, rows, chunk_size):
+        cells = []
+        for _, value, uncertainty in table:
+            chunk = slice(begin, begin + chunk_size)
+            values, uncertainties = format_data(value[chunk],
+                                                uncertainty[chunk])
+            # As in format_data, a non finite uncertainty makes a datum
+            # exact, so e.g. no "\pm nan" is written for siunitx.
+            exact = ~(np.isfinite(uncertainty[chunk])
+                      & (uncertainty[chunk] > 0.))
+            cells.append(cell(values, uncertainties, exact))
+            cells.append(separator)
+        lines = _join([start] + cells[:-1] + [end + "\n"])
+        file.write(_concatenate(lines))
+
+
+def _to_file(function):
+    """Let a writer accept either an open text stream or a file name."""
+    def writer(file, columns, *args, **kwargs):
+        if isinstance(file, str):
+            with open(file, "w", encoding="utf-8") as stream:
+                return function(stream, columns, *args, **kwargs)
+        return function(file, columns, *args, **kwargs)
+
+    writer.__name__ = function.__name__
+    writer.__doc__ = function.__doc__
+    return writer
+
+
+@_to_file
+def write_csv(file, columns, chunk_size=65536):
+    """
+    Write some columns of data as CSV.
+
+    Every column is written as two fields, the value and the uncertainty;
+    the uncertainty field is named after the column with an "s" in front,
+    so the file can be read back with utils.carica_dati.
+
+    Parameters:
+        file (str, text stream): the name of the file, or an open stream.
+        columns (dict): the columns, by name. Every column can be a
+            DatumArray or an array of exact values.
+        chunk_size (int, default=65536): the number of rows formatted at
+            once.
+    """
+    table = _columns(columns)
+    file.write(",".join(name + ",s" + name for name, _, _ in table) + "\n")
+    _write_rows(file, table,
+                lambda values, uncertainties, exact:
+                    _join([values, ",", uncertainties]),
+                ",", "", "", chunk_size)
+
+
+@_to_file
+def write_latex(file, columns, chunk_size=65536):
+    """
+    Write some columns of data as a LaTeX table for siunitx.
+
+    Every column is an S column, whose cells read "value \\pm uncertainty".
+
+    Parameters:
+        file (str, text stream): the name of the file, or an open stream.
+        columns (dict): the columns, by name. Every column can be a
+            DatumArray or an array of exact values.
+        chunk_size (int, default=65536): the number of rows formatted at
+            once.
+    """
+    table = _columns(columns)
+    file.write("\\begin{tabular}{" + "S"*len(table) + "}\n\\hline\n")
+    file.write(" & ".join("{" + name + "}" for name, _, _ in table)
+               + " \\\\\n\\hline\n")
+    _write_rows(file, table,
+                lambda values, uncertainties, exact:
+                    np.where(exact, values,
+                             _join([values, " \\pm ", uncertainties])),
+                " & ", "", " \\\\", chunk_size)
+    file.write("\\hline\n\\end{tabular}\n")
+
+
+@_to_file
+def write_markdown(file, columns, chunk_size=65536):
+    """
+    Write some columns of data as a Markdown table.
+
+    Parameters:
+        file (str, text stream): the name of the file, or an open stream.
+        columns (dict): the columns, by name. Every column can be a
+            DatumArray or an array of exact values.
+        chunk_size (int, default=65536): the number of rows formatted at
+            once.
+    """
+    table = _columns(columns)
+    file.write("| " + " | ".join(name for name, _, _ in table) + " |\n")
+    file.write("|" + " --- |"*len(table) + "\n")
+    _write_rows(file, table,
+                lambda values, uncertainties, exact:
+                    np.where(exact, values,
+                             _join([values, " ± ", uncertainties])),
+                " | ", "| ", " |", chunk_size)
+
+
+if __name__ == "__main__":
+    print("Hi, this is the Tables library.\n\
+           It formats whole columns of data and writes them as CSV,\
+           LaTeX or Markdown tables.")
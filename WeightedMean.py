@@ -0,0 +1,136 @@
+"""The required libraries."""
+import math
+import numbers
+import numpy as np
+import Kernels
+from Datum import Datum
+from DatumArray import DatumArray
+
+
+class WeightedMean:
+    """
+    A streaming weighted mean.
+
+    Every instance keeps only the sum of the weights and the sum of the
+    weighted values of the data added so far, so the data can be fed one by
+    one, as arrays or as a stream of chunks without ever holding them all in
+    memory. Two accumulators can be merged: the partial means computed by
+    different workers or on different parts of an acquisition are combined
+    exactly as if all the data had been added to a single accumulator.
+    """
+
+    def __init__(self, data=None):
+        """
+        Initialize the class.
+
+        Parameters:
+            data (optional): some data to be added at once, see add.
+        """
+        self.weights = 0.
+        self.weighted_values = 0.
+        self.count = 0
+        if data is not None:
+            self.add(data)
+
+    def add(self, data):
+        """
+        Add some data to the mean.
+
+        Parameters:
+            data (Datum, DatumArray, WeightedMean, iterable): the data to be
+                added. Iterables can contain any of these, e.g. a list of
+                Datum or a generator of DatumArray chunks.
+        """
+        if isinstance(data, Datum):
+            weight = 1/data.uncertainty**2
+            self.weights += weight
+            self.weighted_values += weight*data.value
+            self.count += 1
+        elif isinstance(data, DatumArray):
+            self.add_arrays(data.value, data.uncertainty)
+        elif isinstance(data, WeightedMean):
+            self.merge(data)
+        elif isinstance(data, (str, bytes, numbers.Real)):
+            raise TypeError("Cannot add " + repr(data) + " to the mean: the"
+                            " data must be Datum, DatumArray, WeightedMean or"
+                            " iterables of them.")
+        else:
+            for chunk in data:
+                self.add(chunk)
+        return self
+
+    def add_arrays(self, values, uncertainties):
+        """
+        Add some data given as arrays of values and uncertainties.
+
+        Parameters:
+            values (array_like): the values of the data.
+            uncertainties (array_like): the uncertainties of the data.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if Kernels.available(values.size):
+            values, uncertainties = np.broadcast_arrays(
+                values, np.asarray(uncertainties, dtype=np.float64))
+            weights, weighted_values = Kernels.weighted_sums(
+                np.ascontiguousarray(values).ravel(),
+                np.ascontiguousarray(uncertainties).ravel())
+            self.weights += weights
+            self.weighted_values += weighted_values
+            self.count += values.size
+            return self
+
+        weights = np.asarray(uncertainties, dtype=np.float64)**-2
+        self.weights += float(weights.sum())
+        self.weighted_values += float(np.dot(weights.ravel(), values.ravel()))
+        self.count += values.size
+        return self
+
+    def merge(self, other):
+        """
+        Merge another accumulator into this one.
+
+        Parameters:
+            other (WeightedMean): the accumulator to be merged.
+        """
+        self.weights += other.weights
+        self.weighted_values += other.weighted_values
+        self.count += other.count
+        return self
+
+    def __add__(self, other):
+        """Return a new accumulator merging two accumulators."""
+        if not isinstance(other, WeightedMean):
+            return NotImplemented
+
+        return WeightedMean().merge(self).merge(other)
+
+    def __iadd__(self, other):
+        """Merge another accumulator into this one."""
+        if not isinstance(other, WeightedMean):
+            return NotImplemented
+
+        return self.merge(other)
+
+    def result(self):
+        """Return the weighted mean of the data added so far as a Datum."""
+        if not self.weights:
+            raise ValueError("No data was added to the mean.")
+
+        return Datum(self.weighted_values/self.weights,
+                     math.sqrt(1/self.weights))
+
+    def __repr__(self):
+        """
+        Represent the accumulator.
+
+        This function creates a string representing the object.
+        """
+        return "WeightedMean(count=" + str(self.count) + ", weights="\
+            + str(self.weights) + ", weighted_values="\
+            + str(self.weighted_values) + ")"
+
+
+if __name__ == "__main__":
+    print("Hi, this is the streaming weighted mean.\n\
+           It accumulates data one by one or in chunks and can be merged\
+           with the partial means computed elsewhere.")
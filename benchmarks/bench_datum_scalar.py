@@ -0,0 +1,57 @@
+"""
+Microbenchmark of the scalar Datum class.
+
+It prints the latency of the most used operations and the memory taken by
+every instance, so that changes to the hot paths of Datum can be compared.
+
+Usage:
+    python benchmarks/bench_datum_scalar.py
+"""
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Datum import Datum  # noqa: E402
+
+
+def bytes_per_instance(number=100000):
+    """Return the bytes allocated for every live Datum instance."""
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    data = [Datum(float(i), 0.1) for i in range(number)]
+    allocated = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    # The list holding the instances is not part of their cost.
+    return (allocated - sys.getsizeof(data)) / number
+
+
+def latencies(number=200000, repeat=5):
+    """Return the best latency of every operation, in nanoseconds."""
+    namespace = {"Datum": Datum, "a": Datum(2., 0.1), "b": Datum(3., 0.2),
+                 "x": 1.5}
+    statements = {
+        "Datum(2., 0.1)": "Datum(2., 0.1)",
+        "a + b": "a + b",
+        "a - b": "a - b",
+        "a * b": "a * b",
+        "a / b": "a / b",
+        "a * 1.5": "a * x",
+        "1.5 / a": "x / a",
+        "Datum.sqrt(a)": "Datum.sqrt(a)",
+        "Datum.sin(a)": "Datum.sin(a)",
+    }
+    results = {}
+    for name, statement in statements.items():
+        best = min(timeit.repeat(statement, globals=namespace,
+                                 number=number, repeat=repeat))
+        results[name] = best / number * 1e9
+    return results
+
+
+if __name__ == "__main__":
+    for name, latency in latencies().items():
+        print(f"{name:<16} {latency:8.1f} ns/op")
+    print(f"{'bytes/instance':<16} {bytes_per_instance():8.1f}")
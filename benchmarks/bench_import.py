@@ -0,0 +1,50 @@
+"""
+Import-time benchmark of the modules of the library.
+
+Every module is imported in a fresh interpreter with `python -X importtime`
+and the best cumulative import time over some runs is compared with its
+budget. The script exits with status 1 if a budget is exceeded.
+
+Usage:
+    python benchmarks/bench_import.py [runs]
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The import-time budget of every module, in milliseconds. Datum and
+# MeasureMeans must not import NumPy or scipy at all; utils imports NumPy,
+# which dominates its budget. See the README for the rationale.
+BUDGETS = {
+    "Datum": 30.,
+    "MeasureMeans": 30.,
+    "utils": 250.,
+}
+
+
+def import_time(module, runs=5):
+    """Return the best cumulative import time of a module, in milliseconds."""
+    best = float("inf")
+    for _ in range(runs):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import " + module],
+            cwd=ROOT, capture_output=True, text=True, check=True)
+        for line in process.stderr.splitlines():
+            fields = [field.strip() for field in line.split("|")]
+            if len(fields) == 3 and fields[2] == module:
+                best = min(best, int(fields[1]) / 1000.)
+    return best
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    exceeded = False
+    for module, budget in BUDGETS.items():
+        elapsed = import_time(module, runs)
+        status = "ok" if elapsed <= budget else "OVER BUDGET"
+        exceeded = exceeded or elapsed > budget
+        print(f"{module:<14} {elapsed:8.1f} ms  (budget {budget:6.1f} ms)"
+              f"  {status}")
+    sys.exit(1 if exceeded else 0)
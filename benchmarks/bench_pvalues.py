@@ -0,0 +1,73 @@
+"""
+Benchmark of the p-value tables against scipy.stats.
+
+It prints the latency of a scalar p-value and the time of a vectorized
+call with the exact scipy.stats path and with the tables of PValues, and
+the largest relative error of the tables on random statistics.
+
+Usage:
+    python benchmarks/bench_pvalues.py
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PValues import table  # noqa: E402
+
+CASES = {
+    "normal": (None, lambda generator, size: generator.normal(0., 3., size)),
+    "student dof=5": (5., lambda generator, size:
+                      generator.standard_t(5., size)*3.),
+    "chi2 dof=10": (10., lambda generator, size:
+                    generator.chisquare(10., size)*1.5),
+}
+
+
+def exact(test, dof):
+    """Return the exact p-value function of scipy.stats."""
+    from scipy.stats import chi2, norm, t
+
+    if test == "normal":
+        return lambda statistic: norm.sf(abs(statistic))*2
+    if test.startswith("student"):
+        return lambda statistic: t.sf(abs(statistic), dof)*2
+    return lambda statistic: chi2.sf(statistic, dof)
+
+
+def compare(size=1000000, number=2000, repeat=5, seed=0):
+    """Return the timings and the errors of every case."""
+    generator = np.random.default_rng(seed)
+    results = {}
+    for name, (dof, sample) in CASES.items():
+        test = name.split()[0]
+        fast = table(test, dof)
+        slow = exact(name, dof)
+        statistics = sample(generator, size)
+        scalar = float(statistics[0])
+
+        timings = {}
+        for label, function in (("scipy", slow), ("table", fast)):
+            timings[label + " scalar"] = min(timeit.repeat(
+                lambda: function(scalar), number=number,
+                repeat=repeat))/number*1e6
+            timings[label + " vector"] = min(timeit.repeat(
+                lambda: function(statistics), number=1, repeat=repeat))*1e3
+
+        reference = slow(statistics)
+        valid = reference > 0.
+        error = np.max(np.abs(fast(statistics)[valid]/reference[valid] - 1))
+        results[name] = timings, error
+    return results
+
+
+if __name__ == "__main__":
+    for name, (timings, error) in compare().items():
+        print(name)
+        for label, time in timings.items():
+            unit = "us/call" if label.endswith("scalar") else "ms/10^6"
+            print(f"    {label:<14} {time:10.2f} {unit}")
+        print(f"    {'max rel error':<14} {error:10.2e}")
@@ -0,0 +1,327 @@
+"""
+Benchmark suite of the hot paths of the library.
+
+Every benchmark is a function registered with the benchmark decorator: it
+prepares its data and returns the callable to be timed, so the setup is
+never part of the measure. Every callable is run in batches large enough
+to last about 0.2 s (at least one call), and the statistics of the time
+per call over some batches are stored as JSON, together with a
+description of the machine, so that the results of two versions can be
+compared.
+
+Usage:
+    python benchmarks/bench_suite.py [-k FILTER] [-o results.json]
+                                     [--compare baseline.json]
+                                     [--threshold 0.1] [--repeat 5]
+
+With --compare the script prints the ratio between the new and the old
+best time of every benchmark and exits with status 1 if a benchmark is
+slower than the threshold allows.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# The plots are drawn on the non interactive backend.
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import MeasureMeans  # noqa: E402
+import MeasureMeansArray  # noqa: E402
+import utils  # noqa: E402
+from Datum import Datum  # noqa: E402
+from DatumArray import DatumArray  # noqa: E402
+
+BENCHMARKS = {}
+
+
+def benchmark(name, repeat=None):
+    """Register a benchmark, a function returning the callable to time."""
+    def register(setup):
+        BENCHMARKS[name] = (setup, repeat)
+        return setup
+    return register
+
+
+# Scalar Datum operators and static functions.
+_a, _b = Datum(2., 0.1), Datum(3., 0.2)
+_small = Datum(0.3, 0.01)
+_OPERATIONS = {
+    "a + b": lambda: _a + _b,
+    "a - b": lambda: _a - _b,
+    "a * b": lambda: _a * _b,
+    "a / b": lambda: _a / _b,
+    "a * 1.5": lambda: _a * 1.5,
+    "1.5 / a": lambda: 1.5 / _a,
+    "Datum(2., 0.1)": lambda: Datum(2., 0.1),
+}
+for _name in ("sqrt", "cbrt", "exp", "exp2", "log", "log2", "log10", "cos",
+              "sin", "tan", "degrees", "radians"):
+    _OPERATIONS["Datum." + _name] = (
+        lambda function: lambda: function(_a))(getattr(Datum, _name))
+for _name in ("acos", "asin", "atan"):
+    _OPERATIONS["Datum." + _name] = (
+        lambda function: lambda: function(_small))(getattr(Datum, _name))
+_OPERATIONS["Datum.pow"] = lambda: Datum.pow(_a, _b)
+_OPERATIONS["Datum.atan2"] = lambda: Datum.atan2(_a, _b)
+
+for _name, _operation in _OPERATIONS.items():
+    benchmark("datum/" + _name)((lambda operation: lambda: operation)(
+        _operation))
+
+
+# Weighted means.
+def _data(size, seed=0):
+    """Return size random data as a DatumArray."""
+    generator = np.random.default_rng(seed)
+    return DatumArray(generator.normal(10., 1., size),
+                      generator.uniform(0.1, 1., size))
+
+
+for _size in (10, 100, 1000, 10000, 100000, 1000000):
+    @benchmark("weighted_mean/list/" + str(_size))
+    def _list(size=_size):
+        data = _data(size).to_data()
+        return lambda: Datum.weighted_mean(data)
+
+    @benchmark("weighted_mean/array/" + str(_size))
+    def _array(size=_size):
+        data = _data(size)
+        return lambda: Datum.weighted_mean(data)
+
+
+# Instrument models: every function of MeasureMeans, with a value in the
+# middle of its ranges.
+_INSTRUMENTS = {
+    "agilentU1731A_resistance": (150.,),
+    "agilentU1731A_capacitance": (1e-6,),
+    "agilentU1731A_inductance": (1e-3,),
+    "keysightU1733C_resistance": (150.,),
+    "keysightU1733C_capacitance": (1e-6,),
+    "keysightU1733C_inductance": (1e-3,),
+    "amprobe37XRA_DCvoltage": (5.,),
+    "amprobe37XRA_DCcurrent": (5e-3,),
+    "amprobe37XRA_ACvoltage": (5., 50.),
+    "amprobe37XRA_ACcurrent": (5e-3,),
+    "supertester680R_DCvoltage": (5.,),
+    "supertester680R_ACvoltage": (5.,),
+    "supertester680R_DCcurrent": (5e-3,),
+    "supertester680R_ACcurrent": (5e-3,),
+}
+
+for _name, _arguments in _INSTRUMENTS.items():
+    benchmark("instrument/" + _name)(
+        (lambda function, arguments: lambda: lambda: function(*arguments))(
+            getattr(MeasureMeans, _name), _arguments))
+
+    # The array version converts 10^5 readings around the same value.
+    @benchmark("instrument_array/" + _name)
+    def _instrument_array(function=getattr(MeasureMeansArray, _name),
+                          arguments=_arguments):
+        readings = np.linspace(0.5, 1.5, 100000)*arguments[0]
+        return lambda: function(readings, *arguments[1:])
+
+
+@benchmark("instrument_array/masked")
+def _instrument_masked():
+    # Readings over all the ranges, about a third of them invalid.
+    readings = np.geomspace(1e-13, 3e-2, 100000)
+    return lambda: MeasureMeansArray.keysightU1733C_capacitance(
+        readings, 1e3, masked=True)
+
+
+# Fits.
+def _fit_data(model, parameters, size=200, seed=0):
+    """Return noisy data following a model."""
+    generator = np.random.default_rng(seed)
+    x = np.linspace(-5., 5., size)
+    sy = np.full(size, 0.05)
+    y = model(parameters, x) + generator.normal(0., 0.05, size)
+    return x, y, np.full(size, 0.01), sy
+
+
+_MODELS = {
+    "linear_model": (utils.linear_model, [2., 1.]),
+    "constant_model": (utils.constant_model, [3.]),
+    "gaussian_model": (utils.gaussian_model, [5., 0.5, 1.2]),
+}
+
+for _name, (_model, _parameters) in _MODELS.items():
+    @benchmark("fit/" + _name)
+    def _fit(model=_model, parameters=_parameters):
+        x, y, sx, sy = _fit_data(model, parameters)
+        start = [value*1.1 for value in parameters]
+        return lambda: utils.fitta_funzione(x, y, sx, sy, model, (-6., 6.),
+                                            start)
+
+
+# Plotting helpers.
+def _plot(function):
+    """Return a callable running a plotting function and closing figures."""
+    import matplotlib.pyplot as plt
+
+    def run():
+        result = function()
+        plt.close("all")
+        return result
+    return run
+
+
+def _figure_file(name):
+    """Return the path of a figure in a temporary directory."""
+    return os.path.join(tempfile.gettempdir(), "bench_suite_" + name + ".png")
+
+
+@benchmark("plot/Risultati_fit.graph", repeat=3)
+def _plot_fit():
+    x, y, sx, sy = _fit_data(utils.linear_model, [2., 1.])
+    result = utils.fitta_funzione(x, y, sx, sy, utils.linear_model,
+                                  (-6., 6.), [1., 0.])
+    return _plot(lambda: result.graph(_figure_file("graph"), "x", "y"))
+
+
+@benchmark("plot/grafica_funzione", repeat=3)
+def _plot_function():
+    import matplotlib.pyplot as plt
+
+    return _plot(lambda: utils.grafica_funzione(plt.subplots()[1], np.sin,
+                                                (-5., 5.)))
+
+
+@benchmark("plot/grafica_funzioni_singolo_set", repeat=3)
+def _plot_functions():
+    x, y, sx, sy = _fit_data(utils.linear_model, [2., 1.])
+    return _plot(lambda: utils.grafica_funzioni_singolo_set(
+        x, y, sx, sy, [(-5., 0.), (0., 5.)], [np.sin, np.cos],
+        ["red", "blue"], "x", "y", _figure_file("singolo_set")))
+
+
+@benchmark("plot/grafica_cose", repeat=3)
+def _plot_sets():
+    x, y, sx, sy = _fit_data(utils.linear_model, [2., 1.])
+    return _plot(lambda: utils.grafica_cose(
+        [x, x], [y, y + 1.], [sx, sx], [sy, sy], ["red", "blue"],
+        [(-5., 5.)], [np.sin], ["green"], "x", "y", _figure_file("cose")))
+
+
+@benchmark("plot/graficaDati", repeat=3)
+def _plot_data():
+    x, y, sx, sy = _fit_data(utils.linear_model, [2., 1.])
+    return _plot(lambda: utils.graficaDati(x, y, sx, sy, "x", "y",
+                                           _figure_file("dati")))
+
+
+@benchmark("plot/graficoVolante", repeat=3)
+def _plot_quick():
+    x, y, _, _ = _fit_data(utils.linear_model, [2., 1.])
+    return _plot(lambda: utils.graficoVolante(x, y, _figure_file("volante")))
+
+
+def measure(setup, repeat=5, duration=0.2):
+    """
+    Time a benchmark.
+
+    Returns:
+        result (dict): the statistics of the time per call, in seconds, and
+            the number of calls of every batch.
+    """
+    function = setup()
+    timer = timeit.Timer(function)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number*duration/max(elapsed, 1e-9)))
+    times = [time/number for time in timer.repeat(repeat=repeat,
+                                                  number=number)]
+    return {"min": min(times), "median": statistics.median(times),
+            "mean": statistics.fmean(times),
+            "stddev": statistics.stdev(times) if len(times) > 1 else 0.,
+            "number": number, "repeat": repeat}
+
+
+def machine():
+    """Describe the machine and the version of the code."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version(),
+            "numpy": np.__version__, "platform": platform.platform(),
+            "processor": platform.processor(), "cpus": os.cpu_count(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds")}
+
+
+def run(selection="", repeat=5):
+    """Run the benchmarks whose name contains selection."""
+    results = {}
+    for name, (setup, default_repeat) in BENCHMARKS.items():
+        if selection not in name:
+            continue
+        results[name] = measure(setup, default_repeat or repeat)
+        print(f"{name:<44} {_format(results[name]['min'])}", flush=True)
+    return {"machine": machine(), "results": results}
+
+
+def compare(new, old, threshold=0.1):
+    """
+    Compare two runs, printing the ratio of the best times.
+
+    Returns:
+        regressions ([str]): the benchmarks slower than 1 + threshold
+            times the old ones.
+    """
+    regressions = []
+    for name, result in new["results"].items():
+        if name not in old["results"]:
+            continue
+        ratio = result["min"]/old["results"][name]["min"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  SLOWER"
+            regressions.append(name)
+        elif ratio < 1/(1 + threshold):
+            flag = "  faster"
+        print(f"{name:<44} {_format(old['results'][name]['min'])} -> "
+              f"{_format(result['min'])}  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def _format(seconds):
+    """Format a time with a suitable unit."""
+    for unit, scale in (("s ", 1.), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds/scale:9.3f} {unit}"
+    return f"{seconds/1e-9:9.1f} ns"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-k", "--filter", default="",
+                        help="run only the benchmarks containing FILTER")
+    parser.add_argument("-o", "--output", help="write the results as JSON")
+    parser.add_argument("--compare", help="compare with a previous run")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown reported as a regression")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="number of batches of every benchmark")
+    arguments = parser.parse_args()
+
+    report = run(arguments.filter, arguments.repeat)
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as stream:
+            json.dump(report, stream, indent=2)
+    if arguments.compare:
+        with open(arguments.compare, encoding="utf-8") as stream:
+            baseline = json.load(stream)
+        print()
+        sys.exit(1 if compare(report, baseline, arguments.threshold) else 0)
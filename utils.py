@@ -1,8 +1,9 @@
 import numpy as np
 import math
-import matplotlib.pyplot as plt
-from scipy.odr import ODR, Model, RealData
-from scipy.stats import chi2, norm
+from WeightedMean import WeightedMean
+
+# matplotlib and scipy are imported inside the functions using them, so
+# that importing utils stays cheap for the scripts which do not need them.
 
 
 class Risultati_fit:
@@ -27,13 +28,15 @@ class Risultati_fit:
         return stringa
     
     def graph(self, file_name, x_label, y_label):
+        import matplotlib.pyplot as plt
+
         figure, ax = plt.subplots()
         ax.grid()
         ax.errorbar(self.x, self.y, xerr=self.sx, yerr=self.sy, ls=" ", fmt="o", elinewidth=1, capsize=2)
         ax.set_xlabel(x_label)
         ax.set_ylabel(y_label)
         fx = np.linspace(self.begin_fit, self.end_fit, num=5000)
-        fy = np.array([self.model_function(self.valori, c) for c in fx])
+        fy = np.array([self.model_fu(self.valori, c) for c in fx])
         ax.plot(fx, fy)
         figure.savefig(file_name)
         return figure, ax
@@ -45,6 +48,8 @@ gaussian_model = lambda pars, x: pars[0] / np.sqrt(2 * math.pi * pars[2] ** 2) *
 
 
 def fitta_funzione(x, y, sx, sy, function_model, range_fit, par_init):
+    from scipy.odr import ODR, Model, RealData
+
     x, y, sx, sy = np.array(x), np.array(y), np.array(sx), np.array(sy)
     begin_fit, end_fit = range_fit
     indici = (x > begin_fit) & (x < end_fit)
@@ -52,7 +57,7 @@ def fitta_funzione(x, y, sx, sy, function_model, range_fit, par_init):
     modello = Model(function_model)
     par_init = np.array(par_init)
     result_object = ODR(dati, modello, par_init).run()
-    return Risultati_fit((x, y, sx, sy), result_object, function_model, indici[0].size - par_init.size, range_fit)
+    return Risultati_fit((x, y, sx, sy), result_object, function_model, np.count_nonzero(indici) - par_init.size, range_fit)
 
 
 def grafica_funzione(ax, funzione, range_fit):
@@ -66,6 +71,8 @@ def grafica_funzione(ax, funzione, range_fit):
 def grafica_funzioni_singolo_set(
     x, y, sx, sy, range_fits, funzioni, colori, xLabel, yLabel, filename
 ):
+    import matplotlib.pyplot as plt
+
     figure, ax = plt.subplots()
     ax.grid()
     ax.errorbar(x, y, xerr=sx, yerr=sy, ls=" ", fmt="o", elinewidth=1, capsize=2)
@@ -80,6 +87,8 @@ def grafica_funzioni_singolo_set(
 
 
 def grafica_cose(xs, ys, sxs, sys, colori_dati, range_fits, funzioni, colori, xLabel, yLabel, filename):
+    import matplotlib.pyplot as plt
+
     figure, ax = plt.subplots()
     ax.grid()
     for x, y, sx, sy, col in zip(xs, ys, sxs, sys, colori_dati):
@@ -96,22 +105,30 @@ def grafica_cose(xs, ys, sxs, sys, colori_dati, range_fits, funzioni, colori, xL
     figure.savefig(filename)
 
 
-def pValChi2(chi_2, dof):
-    return 1 - chi2.cdf(chi_2, dof)
+def pValChi2(chi_2, dof, fast=False):
+    # With fast=True the p-value is interpolated from a precomputed table,
+    # with relative error below 1e-6 (see PValues).
+    if fast:
+        from PValues import chi2_pvalue
+
+        return chi2_pvalue(chi_2, dof)
+
+    from scipy.stats import chi2
+
+    return chi2.sf(chi_2, dof)
 
 
 def testNormale(x1, x2, sx1, sx2):
+    from scipy.stats import norm
+
     Z = (x1 - x2) / np.sqrt(sx1**2 + sx2**2)
-    pvalue = 2 * (1 - norm.cdf(abs(Z)))
+    pvalue = 2 * norm.sf(abs(Z))
     return Z, pvalue
 
 
 def mediaPesata(valori, errori):
-    valori, errori = np.array(valori), np.array(errori)
-    pesi = 1 / errori**2
-    somma_pesi = pesi.sum()
-    media = (valori * pesi).sum() / somma_pesi
-    return media, np.sqrt(1 / somma_pesi)
+    media = WeightedMean().add_arrays(valori, errori).result()
+    return media.value, media.uncertainty
 
 
 def carica_dati(filename):
@@ -119,6 +136,8 @@ def carica_dati(filename):
 
 
 def graficaDati(x, y, sx, sy, xLabel, yLabel, fileName):
+    import matplotlib.pyplot as plt
+
     figure, ax = plt.subplots()
     ax.grid()
     ax.errorbar(x, y, xerr=sx, yerr=sy, ls=" ", fmt="o", elinewidth=1, capsize=2)
@@ -128,6 +147,8 @@ def graficaDati(x, y, sx, sy, xLabel, yLabel, fileName):
 
 
 def graficoVolante(x, y, fileName):
+    import matplotlib.pyplot as plt
+
     figure, ax = plt.subplots()
     ax.grid()
     ax.errorbar(x, y, ls=" ", fmt="o", elinewidth=1, capsize=2)